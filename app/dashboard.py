@@ -5,6 +5,9 @@ Start: streamlit run app/dashboard.py
 """
 
 import copy
+import io
+import tempfile
+import zipfile
 from pathlib import Path
 
 import pandas as pd
@@ -17,9 +20,14 @@ import sys
 sys.path.insert(0, str(ROOT))
 
 # Core-Logik
-from core.config import BASISJAHR, ZIELJAHR, KORRIDOR_RELATIV, default_params, GEBAEUDETYPEN, GEBIETSTYPEN
+from core.config import BASISJAHR, ZIELJAHR, ZIELJAHR_MAX, KORRIDOR_RELATIV, AUSBAU_REGLER, VORSCHAU_AKTIV, ZEITSCHRITTE, SAISONPROFILE, DISKONTSATZ, default_params, GEBAEUDETYPEN, GEBIETSTYPEN
+from core.cache import daten_hash, korridor, projektion, projektion_by_type
+from core.calibration import kalibriertes_szenario
+from core.costs import kapitalwert, kostenstroeme, jaehrliche_kosten
 from core.data_loader import load_data
-from core.scenario_engine import build_projection, build_projection_by_type, jahr_dekarbonisierung
+from core.export import FORMATE, TABELLEN, exportieren, importieren
+from core.response_surface import get_antwortflaeche, vorbereiten
+from core.scenario_engine import jahr_dekarbonisierung
 
 # Theme
 from theme import get_css, COLORS
@@ -52,6 +60,51 @@ def apply_plot_theme(fig, title_text=""):
     return fig
 
 
+def slider(label, lo, hi, value, step, key):
+    """
+    st.slider, dessen Bereich Werte außerhalb (z.B. aus der Kalibrierung) einschließt.
+    value wird auf den Typ von lo gebracht (st.slider verlangt einheitlich int oder float).
+    """
+    value = type(lo)(value)
+    return st.slider(label, min(lo, value), max(hi, value), value, step, key=key)
+
+
+def linien_modus(res):
+    """Marker nur bei Jahresschritten (bei Monats-/Quartalsschritten nur Linie)."""
+    return "lines+markers" if res.perioden == 1 else "lines"
+
+
+def export_zip(szenarien, df_hist, format):
+    """Szenario-Export (Verzeichnis mit Arrow-/Parquet-Tabellen) als ZIP-Bytes für den Download."""
+    with tempfile.TemporaryDirectory() as tmp:
+        pfad = exportieren(szenarien, tmp, df_hist, format=format)
+        puffer = io.BytesIO()
+        with zipfile.ZipFile(puffer, "w") as zf:
+            for datei in sorted(pfad.iterdir()):
+                zf.write(datei, datei.name)
+    return puffer.getvalue()
+
+
+def import_zip(daten):
+    """Szenario-Einträge aus einem ZIP-Export (nur bekannte Tabellendateien werden entpackt)."""
+    erlaubt = {f"{name}{endung}" for name in TABELLEN for endung in FORMATE.values()}
+    with tempfile.TemporaryDirectory() as tmp, zipfile.ZipFile(io.BytesIO(daten)) as zf:
+        for name in zf.namelist():
+            if name in erlaubt:
+                (Path(tmp) / name).write_bytes(zf.read(name))
+        return importieren(tmp)
+
+
+def typ_pfade(sz):
+    """Typ-Pfade eines Szenarios: importierte Ergebnisse des Eintrags, sonst aus dem geteilten Cache."""
+    return sz["proj_typ"] if sz.get("proj_typ") is not None else projektion_by_type(sz["params"])
+
+
+def korridor_von(sz, df_hist):
+    """Korridor eines Szenarios: importierte Ergebnisse des Eintrags, sonst aus dem geteilten Cache."""
+    return sz["korridor"] if sz.get("korridor") is not None else korridor(sz["params"], df_hist)
+
+
 # ==================== Session State ====================
 
 def init_session():
@@ -190,11 +243,14 @@ def page_szenarien(data):
     # Szenario-Liste
     if szenarien:
         st.markdown("**Ihre Szenarien**")
+        hash_basis = daten_hash(df_hist)
         for i, sz in enumerate(szenarien):
             jd = sz.get("jahr_dekarbonisierung") or "–"
             cols = st.columns([3, 1, 0.5])
             with cols[0]:
                 st.markdown(f"**{sz['name']}** · Dekarbonisierung: {jd}")
+                if sz.get("hash_basis") not in (None, hash_basis):
+                    st.caption("⚠️ Importiert – mit anderen Basisdaten gerechnet als der geladenen Historie. Zum Neurechnen bearbeiten und speichern.")
             with cols[1]:
                 if st.button("Bearbeiten", key=f"edit_{i}"):
                     st.session_state["selected_szenario"] = sz["name"]
@@ -207,6 +263,51 @@ def page_szenarien(data):
                     st.rerun()
         st.markdown("---")
 
+    # Export / Import (Arrow IPC oder Parquet, ohne Neuberechnung beim Import)
+    with st.expander("Export / Import", expanded=False):
+        c1, c2 = st.columns(2)
+        with c1:
+            export_format = st.selectbox("Format", list(FORMATE), index=list(FORMATE).index("parquet"), key="export_format")
+            if szenarien and st.button("Export erstellen", key="export"):
+                st.session_state["export_zip"] = (export_format, export_zip(szenarien, df_hist, export_format))
+            if "export_zip" in st.session_state:
+                fmt, daten = st.session_state["export_zip"]
+                st.download_button("Herunterladen", daten, file_name=f"szenarien_{fmt}.zip", mime="application/zip", key="export_download")
+        with c2:
+            upload = st.file_uploader("Szenarien importieren (ZIP)", type="zip", key="import_zip")
+            if upload is not None and st.session_state.get("import_id") != upload.file_id:
+                try:
+                    neu = import_zip(upload.getvalue())
+                except (ValueError, FileNotFoundError, zipfile.BadZipFile) as e:
+                    st.error(f"Import fehlgeschlagen: {e}")
+                else:
+                    st.session_state["import_id"] = upload.file_id
+                    namen_neu = {sz["name"] for sz in neu}
+                    st.session_state["szenarien"] = [sz for sz in szenarien if sz["name"] not in namen_neu] + neu
+                    st.session_state.pop("export_zip", None)
+                    st.rerun()
+
+    # Kalibrierung an der Historie
+    with st.expander(f"Kalibrierung an der Historie {int(df_hist['jahr'].min())}–{BASISJAHR}", expanded=False):
+        st.markdown("Passt FW-Anschlüsse/Jahr, Heizungstausch/Jahr, Wohnungswachstum und Leitungsmeter pro Anschluss per Least Squares an die beobachteten Jahre an.")
+        if st.button("Kalibriertes Szenario anlegen", key="kalibrieren"):
+            entry = kalibriertes_szenario(df_hist)
+            st.session_state["szenarien"] = [s for s in szenarien if s["name"] != entry["name"]] + [entry]
+            st.rerun()
+        kal_sz = next((s for s in szenarien if "kalibrierung" in s), None)
+        if kal_sz:
+            kal = kal_sz["kalibrierung"]
+            st.dataframe(
+                pd.DataFrame([{"Parameter": k, "Wert": round(v, 3)} for k, v in kal["werte"].items()]),
+                use_container_width=True, hide_index=True,
+            )
+            st.dataframe(
+                pd.DataFrame([{"Reihe": k, "RMSE": round(v, 1)} for k, v in kal["rmse"].items()]),
+                use_container_width=True, hide_index=True,
+            )
+            st.markdown("Residuen je Jahr (Beobachtung − Modell)")
+            st.dataframe(kal["residuen"].round(1), use_container_width=True, hide_index=True)
+
     # Neues Szenario oder Bearbeiten
     namen = [s["name"] for s in szenarien]
     selected = st.session_state.get("selected_szenario")
@@ -253,24 +354,51 @@ def page_szenarien(data):
     # Parameter: Ausbau
     with st.expander("Ausbauparameter", expanded=True):
         c1, c2 = st.columns(2)
+        for i, (key, widget_key, label, lo, hi, step) in enumerate(AUSBAU_REGLER):
+            with c1 if i < 4 else c2:
+                params[key] = slider(label, lo, hi, params[key], step, key=widget_key)
+
+    # Zeithorizont: Zieljahr, Zeitschritt, Saisonprofil
+    with st.expander("Zeithorizont", expanded=False):
+        c1, c2, c3 = st.columns(3)
         with c1:
-            params["fernwaerme_anschluss_bis_2030"] = st.slider("FW-Anschlüsse/Jahr bis 2030", 5_000, 25_000, params["fernwaerme_anschluss_bis_2030"], 1_000, key="fw30")
-            params["fernwaerme_anschluss_ab_2030"] = st.slider("FW-Anschlüsse/Jahr ab 2030", 15_000, 45_000, params["fernwaerme_anschluss_ab_2030"], 1_000, key="fw40")
-            params["heizungstausch_pro_jahr"] = st.slider("Heizungstausch/Jahr", 5_000, 35_000, params["heizungstausch_pro_jahr"], 1_000, key="ht")
-            params["anteil_gas_zu_wasserstoff"] = st.slider("Anteil Gas → H2 (%)", 0, 40, params["anteil_gas_zu_wasserstoff"], 5, key="h2")
+            params["zieljahr"] = slider("Zieljahr", 2030, ZIELJAHR_MAX, int(params.get("zieljahr", ZIELJAHR)), 1, key="zj")
         with c2:
-            params["waermepumpen_pro_jahr"] = st.slider("Wärmepumpen/Jahr", 1_000, 15_000, params["waermepumpen_pro_jahr"], 500, key="wp")
-            params["kochgas_austausch_pro_jahr"] = st.slider("Kochgas-Austausch/Jahr", 5_000, 25_000, params["kochgas_austausch_pro_jahr"], 1_000, key="kg")
-            params["wachstum_wohnungen_pro_jahr"] = st.slider("Wachstum Wohnungen (%/Jahr)", 0.0, 1.5, params["wachstum_wohnungen_pro_jahr"], 0.1, key="wg")
+            schritte = list(ZEITSCHRITTE)
+            params["zeitschritt"] = st.selectbox("Zeitschritt", schritte, index=schritte.index(params.get("zeitschritt", "jahr")), key="zs")
+        with c3:
+            profile = list(SAISONPROFILE)
+            if params.get("saisonprofil", "bausaison") in profile:
+                params["saisonprofil"] = st.selectbox("Saisonprofil", profile, index=profile.index(params.get("saisonprofil", "bausaison")), key="sp")
+
+    # Live-Vorschau (Näherung aus der Antwortfläche, exakt erst beim Speichern)
+    flaeche = get_antwortflaeche(df_hist, warten=False) if VORSCHAU_AKTIV else None
+    if VORSCHAU_AKTIV and flaeche is None:
+        st.caption("Vorschau wird vorbereitet …")
+    elif flaeche is not None:
+        vs = flaeche.vorschau(params)
+        # Die Fläche kennt FW-Anteil und Gas nur für ZIELJAHR; bei früherem Zieljahr (KPIs unten: Zieljahr) keine Werte
+        ziel = min(ZIELJAHR, int(params["zieljahr"]))
+        fw, gas = (f'≈ {vs["fernwaerme_anteil_pct_2040"]:.1f} %', f'{vs["gas_heizung_haushalte_2040"]:,}') if ziel == ZIELJAHR else ("–", "–")
+        st.markdown("**Vorschau** (Näherung – exakte Berechnung beim Speichern)")
+        v1, v2, v3 = st.columns(3)
+        with v1:
+            st.markdown(f'<div class="raus-kpi"><div class="value">{fw}</div><div class="label">FW-Anteil {ziel}</div></div>', unsafe_allow_html=True)
+        with v2:
+            st.markdown(f'<div class="raus-kpi"><div class="value">{gas}</div><div class="label">Gas-Haushalte {ziel}</div></div>', unsafe_allow_html=True)
+        with v3:
+            st.markdown(f'<div class="raus-kpi"><div class="value">{vs["jahr_dekarbonisierung"] or "–"}</div><div class="label">Dekarbonisierung</div></div>', unsafe_allow_html=True)
+        if ziel < ZIELJAHR:
+            st.caption(f"FW-Anteil und Gas-Haushalte in der Vorschau nur für Zieljahr ≥ {ZIELJAHR}.")
 
     # Speichern
     if st.button("Szenario speichern" if is_edit else "Neues Szenario anlegen", type="primary"):
         if not szenario_name.strip():
             st.error("Bitte einen Namen eingeben.")
         else:
-            proj = build_projection(params, df_hist)
+            proj = projektion(params, df_hist)
             jahr_dec = jahr_dekarbonisierung(proj)
-            entry = {"name": szenario_name.strip(), "params": copy.deepcopy(params), "proj_df": proj, "jahr_dekarbonisierung": jahr_dec}
+            entry = {"name": szenario_name.strip(), "params": copy.deepcopy(params), "proj": proj, "jahr_dekarbonisierung": jahr_dec}
             if is_edit:
                 st.session_state["szenarien"][idx] = entry
             else:
@@ -292,8 +420,9 @@ def page_szenarien(data):
 
     sz_choice = st.selectbox("Szenario für KPIs & Grafiken", [s["name"] for s in szenarien], key="sz_choice")
     idx_sz = next(i for i, s in enumerate(szenarien) if s["name"] == sz_choice)
-    proj = szenarien[idx_sz]["proj_df"]
-    target = proj[proj["jahr"] == ZIELJAHR].iloc[0]
+    proj = szenarien[idx_sz]["proj"]
+    ziel = min(ZIELJAHR, int(proj.jahre[-1]))
+    target = proj.zeile(ziel)
     latest = df_hist[df_hist["jahr"] == BASISJAHR].iloc[0]
     jd = szenarien[idx_sz].get("jahr_dekarbonisierung")
 
@@ -301,23 +430,47 @@ def page_szenarien(data):
     with c1:
         st.markdown(f'<div class="raus-kpi"><div class="value">{int(latest["fernwaerme_haushalte"]):,}</div><div class="label">Fernwärme heute</div></div>', unsafe_allow_html=True)
     with c2:
-        st.markdown(f'<div class="raus-kpi"><div class="value">{int(target["fernwaerme_haushalte"]):,}</div><div class="label">Fernwärme 2040</div></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="raus-kpi"><div class="value">{int(target["fernwaerme_haushalte"]):,}</div><div class="label">Fernwärme {ziel}</div></div>', unsafe_allow_html=True)
     with c3:
-        st.markdown(f'<div class="raus-kpi"><div class="value">{target["fernwaerme_anteil_pct"]:.1f} %</div><div class="label">FW-Anteil 2040</div></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="raus-kpi"><div class="value">{target["fernwaerme_anteil_pct"]:.1f} %</div><div class="label">FW-Anteil {ziel}</div></div>', unsafe_allow_html=True)
     with c4:
         st.markdown(f'<div class="raus-kpi"><div class="value">{jd or "–"}</div><div class="label">Dekarbonisierung</div></div>', unsafe_allow_html=True)
 
     st.subheader("Dekarbonisierungspfade pro Gebäudetyp")
-    df_typ = build_projection_by_type(szenarien[idx_sz]["params"])
+    proj_typ = typ_pfade(szenarien[idx_sz])
     colors_typ = [c["chart_1"], c["chart_2"], c["chart_3"], c["chart_5"], c["chart_4"], c["chart_6"]]
     fig_typ = go.Figure()
-    for i, typ in enumerate(df_typ["typ"].unique()):
-        d = df_typ[df_typ["typ"] == typ]
-        fig_typ.add_trace(go.Scatter(x=d["jahr"], y=d["gas_verbleibend"], name=typ, line=dict(color=colors_typ[i % len(colors_typ)], width=2), mode="lines+markers"))
+    for i, typ in enumerate(proj_typ.spalten):
+        fig_typ.add_trace(go.Scatter(x=proj_typ.zeit, y=proj_typ[typ], name=typ, line=dict(color=colors_typ[i % len(colors_typ)], width=2), mode=linien_modus(proj_typ)))
     fig_typ.update_layout(xaxis_title="Jahr", yaxis_title="Gas-Zählpunkte verbleibend")
     apply_plot_theme(fig_typ, f"Dekarbonisierung – {sz_choice}")
     st.plotly_chart(fig_typ, use_container_width=True)
 
+    st.subheader("Kosten")
+    kosten = data.get("kosten")
+    stroeme = kostenstroeme(proj, kosten)
+    df_kosten = jaehrliche_kosten(stroeme)
+    bis_ziel = df_kosten[df_kosten["jahr"] <= ziel]
+    k1, k2, k3 = st.columns(3)
+    with k1:
+        st.markdown(f'<div class="raus-kpi"><div class="value">{kapitalwert(stroeme, bis_jahr=ziel)[0] / 1e9:,.2f} Mrd. €</div><div class="label">Kapitalwert bis {ziel} ({DISKONTSATZ:.0%} p.a.)</div></div>', unsafe_allow_html=True)
+    with k2:
+        st.markdown(f'<div class="raus-kpi"><div class="value">{bis_ziel["capex_eur"].sum() / 1e9:,.2f} Mrd. €</div><div class="label">Investitionen bis {ziel}</div></div>', unsafe_allow_html=True)
+    with k3:
+        st.markdown(f'<div class="raus-kpi"><div class="value">{bis_ziel["opex_eur"].sum() / 1e9:,.2f} Mrd. €</div><div class="label">Betriebskosten bis {ziel}</div></div>', unsafe_allow_html=True)
+
+    bezeichnung = dict(zip(kosten["position"], kosten["bezeichnung"])) if kosten is not None else {}
+    fig_k = go.Figure()
+    for i, (pos, werte) in enumerate(stroeme["capex"].items()):
+        if not werte.any():
+            continue
+        jahreswerte = pd.Series(werte[0]).groupby(stroeme["jahr"]).sum()
+        fig_k.add_trace(go.Bar(x=jahreswerte.index, y=jahreswerte.values / 1e6, name=bezeichnung.get(pos, pos), marker_color=colors_typ[i % len(colors_typ)]))
+    fig_k.add_trace(go.Scatter(x=df_kosten["jahr"], y=df_kosten["opex_eur"] / 1e6, name="Betriebskosten", line=dict(color=c["warning"], width=2), mode="lines+markers"))
+    fig_k.update_layout(barmode="stack", xaxis_title="Jahr", yaxis_title="Mio. € pro Jahr")
+    apply_plot_theme(fig_k, f"Investitionen & Betriebskosten – {sz_choice}")
+    st.plotly_chart(fig_k, use_container_width=True)
+
     st.subheader("Entwicklungspfade Fernwärme & Gas")
     df_hist_plot = df_hist[df_hist["jahr"] <= BASISJAHR].copy().sort_values("jahr")
     fig = go.Figure()
@@ -326,17 +479,16 @@ def page_szenarien(data):
 
     sc_colors = [c["chart_1"], c["chart_2"], c["chart_3"], c["chart_5"], c["chart_4"]]
     for i, sz in enumerate(szenarien):
-        pdf = sz["proj_df"]
+        pdf = sz["proj"]
         if pdf is None or pdf.empty:
             continue
         col = sc_colors[i % len(sc_colors)]
-        proj_lo = build_projection(sz["params"], df_hist, faktor=1.0 - KORRIDOR_RELATIV)
-        proj_hi = build_projection(sz["params"], df_hist, faktor=1.0 + KORRIDOR_RELATIV)
-        jahre = pdf["jahr"].tolist()
+        proj_lo, proj_hi = korridor_von(sz, df_hist)
+        jahre = pdf.zeit
         fig.add_trace(go.Scatter(x=jahre, y=proj_hi["fernwaerme_haushalte"], line=dict(width=0), showlegend=False, hoverinfo="skip"))
         fig.add_trace(go.Scatter(x=jahre, y=proj_lo["fernwaerme_haushalte"], fill="tonexty", fillcolor=f"rgba(252,82,0,0.1)", line=dict(width=0), showlegend=False, hoverinfo="skip"))
-        fig.add_trace(go.Scatter(x=jahre, y=pdf["fernwaerme_haushalte"], name=f"{sz['name']} (FW)", line=dict(color=col, width=2, dash="dash"), mode="lines+markers"))
-        fig.add_trace(go.Scatter(x=jahre, y=pdf["gas_heizung_haushalte"], name=f"{sz['name']} (Gas)", line=dict(color=col, width=1.5, dash="dot"), mode="lines+markers"))
+        fig.add_trace(go.Scatter(x=jahre, y=pdf["fernwaerme_haushalte"], name=f"{sz['name']} (FW)", line=dict(color=col, width=2, dash="dash"), mode=linien_modus(pdf)))
+        fig.add_trace(go.Scatter(x=jahre, y=pdf["gas_heizung_haushalte"], name=f"{sz['name']} (Gas)", line=dict(color=col, width=1.5, dash="dot"), mode=linien_modus(pdf)))
 
     fig.update_layout(xaxis_title="Jahr", yaxis_title="Haushalte")
     apply_plot_theme(fig, f"Fernwärme & Gas – Korridor ±{int(KORRIDOR_RELATIV*100)} %")
@@ -345,22 +497,31 @@ def page_szenarien(data):
     fig2 = go.Figure()
     fig2.add_trace(go.Scatter(x=df_hist_plot["jahr"], y=df_hist_plot["fernwaerme_anteil_pct"], name="Historie", line=dict(color=c["chart_3"], width=2), mode="lines+markers"))
     for i, sz in enumerate(szenarien):
-        pdf = sz["proj_df"]
+        pdf = sz["proj"]
         if pdf is None or pdf.empty:
             continue
         col = sc_colors[i % len(sc_colors)]
-        proj_lo = build_projection(sz["params"], df_hist, faktor=1.0 - KORRIDOR_RELATIV)
-        proj_hi = build_projection(sz["params"], df_hist, faktor=1.0 + KORRIDOR_RELATIV)
-        jahre = pdf["jahr"].tolist()
+        proj_lo, proj_hi = korridor_von(sz, df_hist)
+        jahre = pdf.zeit
         fig2.add_trace(go.Scatter(x=jahre, y=proj_hi["fernwaerme_anteil_pct"], line=dict(width=0), showlegend=False, hoverinfo="skip"))
         fig2.add_trace(go.Scatter(x=jahre, y=proj_lo["fernwaerme_anteil_pct"], fill="tonexty", fillcolor="rgba(59,130,246,0.15)", line=dict(width=0), showlegend=False, hoverinfo="skip"))
-        fig2.add_trace(go.Scatter(x=jahre, y=pdf["fernwaerme_anteil_pct"], name=sz["name"], line=dict(color=col, width=2, dash="dash"), mode="lines+markers"))
+        fig2.add_trace(go.Scatter(x=jahre, y=pdf["fernwaerme_anteil_pct"], name=sz["name"], line=dict(color=col, width=2, dash="dash"), mode=linien_modus(pdf)))
     fig2.update_layout(xaxis_title="Jahr", yaxis_title="Fernwärme-Anteil (%)")
     apply_plot_theme(fig2, "Fernwärmeanteil – Szenarien")
     st.plotly_chart(fig2, use_container_width=True)
 
-    rows = [{"Szenario": s["name"], "Dekarbonisierung (Jahr)": s.get("jahr_dekarbonisierung") or "–"} for s in szenarien]
-    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+    # Kapitalwert über einen gemeinsamen Horizont, sonst sind Szenarien mit späterem Zieljahr nicht vergleichbar
+    horizont = min(ZIELJAHR, *(int(s["proj"].jahre[-1]) for s in szenarien))
+    rows = [
+        {
+            "Szenario": s["name"],
+            "Dekarbonisierung (Jahr)": s.get("jahr_dekarbonisierung"),
+            f"Kapitalwert bis {horizont} (Mrd. €)": round(float(kapitalwert(kostenstroeme(s["proj"], kosten), bis_jahr=horizont)[0]) / 1e9, 2),
+        }
+        for s in szenarien
+    ]
+    df_rows = pd.DataFrame(rows).astype({"Dekarbonisierung (Jahr)": "Int64"})
+    st.dataframe(df_rows, use_container_width=True, hide_index=True)
 
 
 # ==================== Main ====================
@@ -369,6 +530,9 @@ def main():
     st.set_page_config(page_title="Raus aus Gas – Wien", page_icon="🌡️", layout="wide", initial_sidebar_state="expanded")
     render_header()
     data = load_data()
+    df_hist = data.get("fernwaerme")
+    if VORSCHAU_AKTIV and df_hist is not None and not df_hist.empty:
+        vorbereiten(df_hist)  # Antwortfläche im Hintergrund, die erste Szenarien-Seite wartet nicht darauf
 
     st.sidebar.title("Navigation")
     page = st.sidebar.radio(
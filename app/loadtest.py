@@ -0,0 +1,334 @@
+"""
+Lasttest für das Dashboard mit Streamlits headless App-Testing (streamlit.testing.v1.AppTest).
+
+Simuliert N gleichzeitige Sitzungen, die Historie, Themenschwerpunkte und Szenarien
+durchklicken, Szenarien anlegen und bearbeiten; alle starten gemeinsam.
+Modus "prozess" (Standard): das Dashboard per AppTest, jede Sitzung in einem eigenen Prozess
+(AppTest setzt prozessweiten Runtime-Zustand). RSS-Peak gilt je Interpreter, nicht je Sitzung.
+Modus "thread": dieselben Core-Aufrufe ohne Oberfläche, alle Sitzungen als Threads in einem
+Prozess – prüft die Skalierung des geteilten Zustands (Cache, Antwortfläche) wie im Server.
+Ausgabe: p50/p95/p99 der Latenz (gesamt und je Aktion), CPU je Sitzung, Speicherzuwachs.
+
+Start:  python app/loadtest.py --sitzungen 8 --szenarien 4 [--modus thread]
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from queue import Empty
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = Path(__file__).resolve().parent
+DASHBOARD = APP_DIR / "dashboard.py"
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _rss_peak_mb() -> float | None:
+    """Maximaler Resident Set Size des Prozesses in MB (Linux: KB, macOS: Bytes)."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024**2 if sys.platform == "darwin" else rss / 1024
+
+
+def _button(at, label: str):
+    return next(b for b in at.button if b.label == label)
+
+
+def klickpfad(n_szenarien: int, timeout: float):
+    """
+    Ablauf einer Sitzung als Generator von (aktion, AppTest-Rerun).
+    Jeder Schritt ist ein Rerun, dessen Latenz gemessen wird.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(DASHBOARD), default_timeout=timeout)
+    yield "start", at.run
+    for seite in ["Historie", "Themenschwerpunkte", "Szenarien"]:
+        yield "navigation", lambda seite=seite: at.sidebar.radio[0].set_value(seite).run()
+
+    for i in range(n_szenarien):
+        yield "eingabe", lambda i=i: at.text_input(key="sz_name").set_value(f"Last {i + 1}").run()
+        yield "eingabe", lambda i=i: at.slider(key="fw30").set_value(5_000 + (i % 21) * 1_000).run()
+        yield "anlegen", lambda: _button(at, "Neues Szenario anlegen").click().run()
+
+    for i in range(n_szenarien):
+        yield "bearbeiten", lambda i=i: at.button(key=f"edit_{i}").click().run()
+        yield "eingabe", lambda i=i: at.text_input(key="sz_name").set_value(f"Last {i + 1}").run()
+        yield "eingabe", lambda i=i: at.slider(key="ht").set_value(5_000 + (i % 31) * 1_000).run()
+        yield "speichern", lambda: _button(at, "Szenario speichern").click().run()
+
+    for i in range(n_szenarien):
+        yield "auswahl", lambda i=i: at.selectbox(key="sz_choice").set_value(f"Last {i + 1}").run()
+
+    yield "navigation", lambda: at.sidebar.radio[0].set_value("Historie").run()
+
+
+def klickpfad_kern(n_szenarien: int, timeout: float):
+    """
+    Derselbe Ablauf ohne Oberfläche: je Schritt die Core-Aufrufe, die das Dashboard beim Rerun
+    macht (Daten, Vorschau, Projektion, Korridor, Typ-Pfade, Kosten). Für Modus "thread" –
+    AppTest selbst ist nicht thread-fähig (setzt bei jedem Rerun prozessweiten Runtime-Zustand).
+    """
+    sys.path.insert(0, str(APP_DIR.parent))
+    from core.cache import korridor, projektion, projektion_by_type
+    from core.config import default_params
+    from core.costs import kapitalwert, kostenstroeme
+    from core.data_loader import load_data
+    from core.response_surface import get_antwortflaeche
+    from core.scenario_engine import jahr_dekarbonisierung
+
+    szenarien = []
+    df_hist = load_data()["fernwaerme"]
+
+    def vorschau(params):
+        return get_antwortflaeche(df_hist).vorschau(params)
+
+    def anzeigen(i):
+        # Szenarien-Seite: KPIs, Typ-Pfade und Kosten des gewählten, Korridore aller Szenarien
+        params, proj = szenarien[i]
+        projektion_by_type(params)
+        for p, pr in szenarien:
+            korridor(p, df_hist)
+            kapitalwert(kostenstroeme(pr))
+
+    def speichern(i, params):
+        proj = projektion(params, df_hist)
+        jahr_dekarbonisierung(proj)
+        eintrag = (params, proj)
+        if i < len(szenarien):
+            szenarien[i] = eintrag
+        else:
+            szenarien.append(eintrag)
+        anzeigen(i)
+
+    yield "start", lambda: vorschau(default_params())
+    for _ in range(3):
+        yield "navigation", load_data
+
+    for i in range(n_szenarien):
+        params = default_params()
+        yield "eingabe", lambda params=params: vorschau(params)
+        params = params | {"fernwaerme_anschluss_bis_2030": 5_000 + (i % 21) * 1_000}
+        yield "eingabe", lambda params=params: vorschau(params)
+        yield "anlegen", lambda i=i, params=params: speichern(i, params)
+
+    for i in range(n_szenarien):
+        yield "bearbeiten", lambda i=i: vorschau(szenarien[i][0])
+        yield "eingabe", lambda i=i: vorschau(szenarien[i][0])
+        yield "eingabe", lambda i=i: vorschau(szenarien[i][0] | {"heizungstausch_pro_jahr": 5_000 + (i % 31) * 1_000})
+        yield "speichern", lambda i=i: speichern(i, szenarien[i][0] | {"heizungstausch_pro_jahr": 5_000 + (i % 31) * 1_000})
+
+    for i in range(n_szenarien):
+        yield "auswahl", lambda i=i: anzeigen(i)
+
+    yield "navigation", load_data
+
+
+# Zeit für Start und Import je Sitzung, bevor alle gemeinsam loslaufen (s)
+START_TIMEOUT = 120.0
+
+
+def _reruns(n_szenarien: int) -> int:
+    """Anzahl Reruns eines Klickpfads (für die Gesamt-Deadline)."""
+    return 5 + 8 * n_szenarien
+
+
+def _klicken(nr: int, pfad, barrier, cpu_zeit) -> dict:
+    """Klickpfad (Generator von (aktion, schritt)) nach gemeinsamem Start ausführen; Latenzen, CPU und Fehler."""
+    latenzen = []
+    fehler = None
+    try:
+        barrier.wait(timeout=START_TIMEOUT)
+    except Exception as e:  # threading.BrokenBarrierError: eine andere Sitzung kam nicht an
+        return {"sitzung": nr, "latenzen": [], "cpu_s": None, "wand_s": None, "fehler": f"Start abgebrochen: {type(e).__name__}"}
+    cpu_start = cpu_zeit()
+    wand_start = time.perf_counter()
+    try:
+        for aktion, schritt in pfad:
+            t0 = time.perf_counter()
+            at = schritt()
+            latenzen.append((aktion, time.perf_counter() - t0))
+            if getattr(at, "exception", None):
+                raise RuntimeError(at.exception[0].message)
+    except Exception as e:
+        fehler = f"{type(e).__name__}: {e}"
+    return {
+        "sitzung": nr,
+        "latenzen": latenzen,
+        "cpu_s": cpu_zeit() - cpu_start,
+        "wand_s": time.perf_counter() - wand_start,
+        "fehler": fehler,
+    }
+
+
+def _sitzung(nr: int, n_szenarien: int, timeout: float, barrier, queue) -> None:
+    """Eine Sitzung im eigenen Prozess (modus "prozess"): Messwerte in die Queue."""
+    sys.path.insert(0, str(APP_DIR))
+    os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+    import streamlit.testing.v1  # noqa: F401 – Importzeit nicht mitmessen
+
+    rss_vorher = _rss_peak_mb()
+    ergebnis = _klicken(nr, klickpfad(n_szenarien, timeout), barrier, time.process_time)
+    rss_nachher = _rss_peak_mb()
+    queue.put(ergebnis | {
+        "rss_prozess_peak_mb": rss_nachher,
+        "rss_zuwachs_mb": None if rss_nachher is None else rss_nachher - rss_vorher,
+    })
+
+
+def _fehlend(nr: int, grund: str) -> dict:
+    return {"sitzung": nr, "latenzen": [], "cpu_s": None, "wand_s": None, "rss_prozess_peak_mb": None, "rss_zuwachs_mb": None, "fehler": grund}
+
+
+def _prozesse(sitzungen: int, n_szenarien: int, timeout: float) -> tuple[list, dict]:
+    """Jede Sitzung in einem eigenen Prozess (isoliert, aber ohne geteilten Cache/Antwortfläche)."""
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(sitzungen)
+    queue = ctx.Queue()
+    procs = [ctx.Process(target=_sitzung, args=(i, n_szenarien, timeout, barrier, queue)) for i in range(sitzungen)]
+    for p in procs:
+        p.start()
+
+    deadline = time.monotonic() + START_TIMEOUT + timeout * _reruns(n_szenarien)
+    ergebnisse = {}
+    while len(ergebnisse) < sitzungen and time.monotonic() < deadline:
+        try:
+            e = queue.get(timeout=1.0)
+            ergebnisse[e["sitzung"]] = e
+        except Empty:
+            if not any(p.is_alive() for p in procs):
+                break  # alle beendet, Queue leer: Rest ist ohne Ergebnis abgestürzt
+    for i, p in enumerate(procs):
+        p.join(timeout=5)
+        if p.is_alive():
+            p.terminate()
+            p.join()
+        if i not in ergebnisse:
+            grund = "Zeitüberschreitung" if p.exitcode in (None, -15) else f"Prozess ohne Ergebnis beendet (exitcode {p.exitcode})"
+            ergebnisse[i] = _fehlend(i, grund)
+    return [ergebnisse[i] for i in range(sitzungen)], {}
+
+
+def _threads(sitzungen: int, n_szenarien: int, timeout: float) -> tuple[list, dict]:
+    """
+    Alle Sitzungen als Threads in einem Prozess (klickpfad_kern) – wie im Streamlit-Server mit
+    geteiltem Cache und geteilter Antwortfläche. Speicher nur für den ganzen Prozess messbar.
+    """
+    barrier = threading.Barrier(sitzungen)
+    ergebnisse = {}
+    lock = threading.Lock()
+
+    def lauf(nr: int) -> None:
+        e = _klicken(nr, klickpfad_kern(n_szenarien, timeout), barrier, time.thread_time)
+        with lock:
+            ergebnisse[nr] = e | {"rss_prozess_peak_mb": None, "rss_zuwachs_mb": None}
+
+    rss_vorher = _rss_peak_mb()
+    threads = [threading.Thread(target=lauf, args=(i,), daemon=True) for i in range(sitzungen)]
+    for t in threads:
+        t.start()
+    deadline = time.monotonic() + START_TIMEOUT + timeout * _reruns(n_szenarien)
+    for t in threads:
+        t.join(timeout=max(0.0, deadline - time.monotonic()))
+    rss_nachher = _rss_peak_mb()
+
+    with lock:
+        liste = [ergebnisse.get(i) or _fehlend(i, "Zeitüberschreitung") for i in range(sitzungen)]
+    zuwachs = None if rss_nachher is None else rss_nachher - rss_vorher
+    prozess = {
+        "rss_prozess_peak_mb": rss_nachher,
+        "rss_zuwachs_mb": zuwachs,
+        "rss_zuwachs_je_sitzung_mb": None if zuwachs is None else zuwachs / sitzungen,
+    }
+    return liste, prozess
+
+
+def lasttest(sitzungen: int = 4, n_szenarien: int = 3, timeout: float = 30.0, modus: str = "prozess") -> dict:
+    """
+    Startet `sitzungen` gleichzeitige Sitzungen und sammelt die Messwerte.
+    modus "prozess": Dashboard per AppTest, ein Prozess je Sitzung (RSS-Peak gilt je Interpreter,
+                     aussagekräftig ist rss_zuwachs_mb); Cache und Antwortfläche je Prozess.
+    modus "thread": Core-Aufrufe des Dashboards, alle Sitzungen als Threads in einem Prozess
+                    (geteilter Cache und Antwortfläche wie im Server).
+    Ergebnis: sitzungen (DataFrame je Sitzung), latenzen (DataFrame je Schritt), perzentile,
+              prozess (Speicher des gemeinsamen Prozesses, nur modus "thread")
+    """
+    if modus not in ("thread", "prozess"):
+        raise ValueError(f"Unbekannter Modus {modus!r}, erlaubt: thread, prozess")
+    ergebnisse, prozess = (_threads if modus == "thread" else _prozesse)(sitzungen, n_szenarien, timeout)
+
+    df_lat = pd.DataFrame(
+        [{"sitzung": e["sitzung"], "aktion": a, "latenz_ms": 1000 * t} for e in ergebnisse for a, t in e["latenzen"]]
+    )
+    spalten = ("sitzung", "cpu_s", "wand_s", "rss_prozess_peak_mb", "rss_zuwachs_mb", "fehler")
+    df_sz = pd.DataFrame([{k: e[k] for k in spalten} | {"reruns": len(e["latenzen"])} for e in ergebnisse])
+    return {"sitzungen": df_sz, "latenzen": df_lat, "perzentile": perzentile(df_lat), "prozess": prozess}
+
+
+def perzentile(df_lat: pd.DataFrame) -> pd.DataFrame:
+    """p50/p95/p99 der Rerun-Latenz in ms, gesamt und je Aktion."""
+    if df_lat.empty:
+        return pd.DataFrame(columns=["aktion", "n", "p50_ms", "p95_ms", "p99_ms"])
+    gruppen = [("gesamt", df_lat["latenz_ms"])] + [(a, d["latenz_ms"]) for a, d in df_lat.groupby("aktion", sort=False)]
+    rows = []
+    for aktion, werte in gruppen:
+        p50, p95, p99 = np.percentile(werte.to_numpy(), [50, 95, 99])
+        rows.append({"aktion": aktion, "n": len(werte), "p50_ms": round(p50, 1), "p95_ms": round(p95, 1), "p99_ms": round(p99, 1)})
+    return pd.DataFrame(rows)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Lasttest Raus-aus-Gas-Dashboard (headless, N gleichzeitige Sitzungen)")
+    parser.add_argument("--sitzungen", type=int, default=4, help="Anzahl gleichzeitiger Sitzungen")
+    parser.add_argument("--szenarien", type=int, default=3, help="Szenarien, die jede Sitzung anlegt und bearbeitet")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Timeout je Rerun (s)")
+    parser.add_argument("--modus", choices=["prozess", "thread"], default="prozess", help="prozess: Dashboard per AppTest, ein Prozess je Sitzung · thread: Core-Aufrufe, Sitzungen als Threads mit geteiltem Zustand")
+    parser.add_argument("--max-p95-ms", type=float, default=None, help="Exit-Code 1, wenn p95 (gesamt) darüber liegt")
+    parser.add_argument("--json", type=Path, default=None, help="Ergebnisse zusätzlich als JSON speichern")
+    args = parser.parse_args(argv)
+
+    res = lasttest(args.sitzungen, args.szenarien, args.timeout, args.modus)
+    df_sz, df_p, prozess = res["sitzungen"], res["perzentile"], res["prozess"]
+
+    with pd.option_context("display.width", 160, "display.max_columns", 20):
+        print(f"\nRerun-Latenz ({args.sitzungen} Sitzungen, {args.szenarien} Szenarien je Sitzung, Modus {args.modus})")
+        print(df_p.to_string(index=False))
+        print("\nJe Sitzung")
+        print(df_sz.dropna(axis=1, how="all").round(2).to_string(index=False))
+        print(f"\nCPU je Sitzung: {df_sz['cpu_s'].mean():.2f} s (Mittel)")
+        if args.modus == "thread":
+            if prozess["rss_zuwachs_mb"] is not None:
+                print(f"Speicherzuwachs des Prozesses: {prozess['rss_zuwachs_mb']:.0f} MB · je Sitzung: {prozess['rss_zuwachs_je_sitzung_mb']:.1f} MB")
+        else:
+            if df_sz["rss_zuwachs_mb"].notna().any():
+                print(f"Speicherzuwachs je Sitzung: {df_sz['rss_zuwachs_mb'].mean():.0f} MB (Mittel; RSS-Peak gilt je Interpreter-Prozess)")
+
+    if args.json:
+        args.json.write_text(json.dumps({
+            "sitzungen": df_sz.to_dict(orient="records"),
+            "perzentile": df_p.to_dict(orient="records"),
+            "prozess": prozess,
+        }, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    if df_sz["fehler"].notna().any():
+        return 1
+    if args.max_p95_ms is not None and not df_p.empty:
+        if float(df_p.loc[df_p["aktion"] == "gesamt", "p95_ms"].iloc[0]) > args.max_p95_ms:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
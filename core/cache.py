@@ -0,0 +1,243 @@
+"""
+Sitzungsübergreifender Ergebnis-Cache für Projektionen.
+
+Alle Streamlit-Sitzungen eines Prozesses teilen sich einen LRU-Speicher; optional
+kommt eine SQLite-Datei als zweite Stufe hinzu, die sich mehrere Worker-Prozesse teilen
+(WAL-Modus, größenbegrenzt). Schlüssel sind kanonische Parameter (sortiertes JSON) plus
+Hash der Basisdaten – Speicher und CPU wachsen mit verschiedenen Szenarien, nicht mit Nutzern.
+
+Gecachte Ergebnisse (ProjectionResult, schreibgeschützte Arrays) werden zwischen Sitzungen geteilt.
+
+Disk-Cache aktivieren: Umgebungsvariable RAUS_AUS_GAS_CACHE=/pfad/zur/cache.sqlite
+Die SQLite-Stufe speichert Ergebnisse per pickle und lädt sie ungeprüft: die Datei (und ihr
+Verzeichnis) darf nur für den Benutzer der App schreibbar sein. Sie überdauert Deployments –
+CACHE_VERSION ist Teil jedes Schlüssels, ältere Einträge werden dann nicht mehr gelesen.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .config import CACHE_MAX_EINTRAEGE, CACHE_MAX_MB, KORRIDOR_RELATIV
+from .result import ProjectionResult
+from .scenario_engine import METRIKEN, build_projection, build_projection_by_type
+
+# Bei Änderungen an der Engine-Logik oder am Ergebnisformat erhöhen: Einträge der SQLite-Stufe verfallen
+CACHE_VERSION = 2
+
+
+def _normalisieren(x):
+    """Zahlen vereinheitlichen (12000.0 == 12000, numpy → Python), damit gleiche Szenarien gleiche Schlüssel haben."""
+    if isinstance(x, dict):
+        return {str(k): _normalisieren(v) for k, v in x.items()}
+    if isinstance(x, (list, tuple)):
+        return [_normalisieren(v) for v in x]
+    if isinstance(x, np.generic):
+        x = x.item()
+    if isinstance(x, float) and x.is_integer():
+        return int(x)
+    return x
+
+
+def kanonisch(params: dict) -> str:
+    """Kanonische JSON-Darstellung der Parameter (sortierte Schlüssel, normierte Zahlen)."""
+    return json.dumps(_normalisieren(params), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def daten_hash(df: pd.DataFrame) -> str:
+    """Inhalts-Hash eines DataFrames (z.B. der Historie), Teil des Cache-Schlüssels."""
+    h = hashlib.sha256(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    h.update(",".join(map(str, df.columns)).encode())
+    return h.hexdigest()[:16]
+
+
+def cache_key(name: str, *teile) -> str:
+    """Schlüssel aus CACHE_VERSION, Funktionsname und kanonisierten Argumenten."""
+    roh = f"{CACHE_VERSION}|{name}|" + "|".join(kanonisch(t) if isinstance(t, dict) else json.dumps(_normalisieren(t)) for t in teile)
+    return hashlib.sha256(roh.encode("utf-8")).hexdigest()
+
+
+class SharedCache:
+    """
+    Thread-sicherer LRU-Cache (max_eintraege) mit optionaler SQLite-Stufe (max_mb).
+    Gleichzeitige Anfragen nach demselben Schlüssel werden nur einmal berechnet.
+    """
+
+    def __init__(self, max_eintraege: int = CACHE_MAX_EINTRAEGE, pfad: str | Path | None = None, max_mb: float = CACHE_MAX_MB):
+        self.max_eintraege = max_eintraege
+        self.pfad = Path(pfad) if pfad else None
+        self.max_bytes = int(max_mb * 1024**2)
+        self._speicher = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._lokal = threading.local()
+        self.treffer = 0
+        self.fehlschlaege = 0
+        if self.pfad:
+            self.pfad.parent.mkdir(parents=True, exist_ok=True)
+            con = self._con()
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS ergebnisse ("
+                "key TEXT PRIMARY KEY, wert BLOB NOT NULL, groesse INTEGER NOT NULL, zugriff REAL NOT NULL)"
+            )
+            con.execute("CREATE INDEX IF NOT EXISTS ergebnisse_zugriff ON ergebnisse (zugriff)")
+
+    # ----- SQLite-Stufe -----
+
+    def _con(self) -> sqlite3.Connection:
+        """Eine Verbindung pro Thread (sqlite3-Verbindungen sind nicht thread-übergreifend nutzbar)."""
+        con = getattr(self._lokal, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.pfad, timeout=30, isolation_level=None)
+            con.execute("PRAGMA busy_timeout=30000")
+            self._lokal.con = con
+        return con
+
+    def _disk_get(self, key: str):
+        if not self.pfad:
+            return None
+        con = self._con()
+        row = con.execute("SELECT wert FROM ergebnisse WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        con.execute("UPDATE ergebnisse SET zugriff = ? WHERE key = ?", (time.time(), key))
+        return pickle.loads(row[0])
+
+    def _disk_set(self, key: str, wert) -> None:
+        if not self.pfad:
+            return
+        blob = pickle.dumps(wert, protocol=pickle.HIGHEST_PROTOCOL)
+        con = self._con()
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            con.execute(
+                "INSERT OR REPLACE INTO ergebnisse (key, wert, groesse, zugriff) VALUES (?, ?, ?, ?)",
+                (key, blob, len(blob), time.time()),
+            )
+            # Älteste Einträge verdrängen, bis die Größengrenze eingehalten ist
+            gesamt = con.execute("SELECT COALESCE(SUM(groesse), 0) FROM ergebnisse").fetchone()[0]
+            if gesamt > self.max_bytes:
+                zuviel = gesamt - self.max_bytes
+                alte = con.execute("SELECT key, groesse FROM ergebnisse WHERE key != ? ORDER BY zugriff", (key,))
+                weg = []
+                for k, g in alte:
+                    if zuviel <= 0:
+                        break
+                    weg.append((k,))
+                    zuviel -= g
+                con.executemany("DELETE FROM ergebnisse WHERE key = ?", weg)
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK")
+            raise
+
+    # ----- Öffentliche API -----
+
+    def get(self, key: str):
+        """Wert zum Schlüssel oder None (Speicher, dann SQLite)."""
+        with self._lock:
+            if key in self._speicher:
+                self._speicher.move_to_end(key)
+                return self._speicher[key]
+        wert = self._disk_get(key)
+        if wert is not None:
+            self._merken(key, wert)
+        return wert
+
+    def set(self, key: str, wert) -> None:
+        self._merken(key, wert)
+        self._disk_set(key, wert)
+
+    def _merken(self, key: str, wert) -> None:
+        with self._lock:
+            self._speicher[key] = wert
+            self._speicher.move_to_end(key)
+            while len(self._speicher) > self.max_eintraege:
+                self._speicher.popitem(last=False)
+
+    def get_or_compute(self, key: str, berechnen):
+        """Wert aus dem Cache oder berechnen (pro Schlüssel nur ein Thread gleichzeitig)."""
+        wert = self.get(key)
+        if wert is not None:
+            self._zaehlen(treffer=1)
+            return wert
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        try:
+            with key_lock:
+                wert = self.get(key)
+                if wert is None:
+                    self._zaehlen(fehlschlaege=1)
+                    wert = berechnen()
+                    self.set(key, wert)
+                else:
+                    self._zaehlen(treffer=1)
+        finally:
+            # Auch wenn berechnen() fehlschlägt: Schlüssel-Lock nicht liegen lassen
+            with self._lock:
+                self._key_locks.pop(key, None)
+        return wert
+
+    def _zaehlen(self, treffer: int = 0, fehlschlaege: int = 0) -> None:
+        with self._lock:
+            self.treffer += treffer
+            self.fehlschlaege += fehlschlaege
+
+    def clear(self) -> None:
+        with self._lock:
+            self._speicher.clear()
+        if self.pfad:
+            self._con().execute("DELETE FROM ergebnisse")
+
+    def stats(self) -> dict:
+        with self._lock:
+            n, treffer, fehlschlaege = len(self._speicher), self.treffer, self.fehlschlaege
+        return {"eintraege": n, "treffer": treffer, "fehlschlaege": fehlschlaege, "pfad": str(self.pfad) if self.pfad else None}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> SharedCache:
+    """Prozessweiter Cache (einmal pro Prozess angelegt, Disk-Stufe über RAUS_AUS_GAS_CACHE)."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SharedCache(pfad=os.environ.get("RAUS_AUS_GAS_CACHE") or None)
+    return _cache
+
+
+# ==================== Gecachte Engine-Aufrufe ====================
+
+def _projektion_key(params: dict, hash_basis: str, faktor: float) -> str:
+    # METRIKEN im Schlüssel: Disk-Einträge älterer Versionen (andere Spalten) nicht wiederverwenden
+    return cache_key("build_projection", params, hash_basis, faktor, METRIKEN)
+
+
+def projektion(params: dict, df_hist: pd.DataFrame, faktor: float = 1.0) -> ProjectionResult:
+    """build_projection() über den geteilten Cache."""
+    key = _projektion_key(params, daten_hash(df_hist), faktor)
+    return get_cache().get_or_compute(key, lambda: build_projection(params, df_hist, faktor=faktor))
+
+
+def projektion_by_type(params: dict) -> ProjectionResult:
+    """build_projection_by_type() über den geteilten Cache."""
+    key = cache_key("build_projection_by_type", params)
+    return get_cache().get_or_compute(key, lambda: build_projection_by_type(params))
+
+
+def korridor(params: dict, df_hist: pd.DataFrame, relativ: float = KORRIDOR_RELATIV) -> tuple[ProjectionResult, ProjectionResult]:
+    """Untere und obere Korridor-Projektion (faktor 1 ∓ relativ) über den geteilten Cache."""
+    return projektion(params, df_hist, 1.0 - relativ), projektion(params, df_hist, 1.0 + relativ)
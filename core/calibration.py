@@ -0,0 +1,181 @@
+"""
+Kalibrierung der Ausbauraten an der Historie 2010–BASISJAHR.
+
+Die Projektionslogik aus build_projection() wird über die beobachteten Jahre
+zurückgerechnet (Back-Cast) und die Raten per Least Squares an die Beobachtungen
+angepasst. Die Rückrechnung ist über Parametersätze vektorisiert: Jacobi-Matrix
+(Vorwärtsdifferenzen) und Dämpfungsvarianten werden jeweils in einem Batch berechnet.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .config import BASISJAHR, default_params
+from .scenario_engine import build_projection, jahr_dekarbonisierung
+
+# Beobachtete Reihen (Spalten in fernwaerme_haushalte.csv), Reihenfolge = Achse 1 der Rückrechnung
+REIHEN = [
+    "fernwaerme_haushalte",
+    "gas_heizung_haushalte",
+    "gesamt_wohnungen",
+    "fernwaerme_leitungen_km",
+]
+
+# Parameter, die standardmäßig angepasst werden (historisch identifizierbar)
+KALIBRIER_PARAMETER = [
+    "fernwaerme_anschluss_bis_2030",
+    "heizungstausch_pro_jahr",
+    "wachstum_wohnungen_pro_jahr",
+    "fernwaerme_leitungen_m_pro_anschluss",
+]
+
+# Parameter mit ganzzahligen Werten im Szenario (Slider in der App)
+_GANZZAHLIG = {
+    "fernwaerme_anschluss_bis_2030",
+    "fernwaerme_anschluss_ab_2030",
+    "heizungstausch_pro_jahr",
+    "anteil_gas_zu_wasserstoff",
+    "waermepumpen_pro_jahr",
+}
+
+
+def rueckrechnung(theta: np.ndarray, parameter: list, params: dict, start: pd.Series, n_jahre: int) -> np.ndarray:
+    """
+    Rechnet die Projektionslogik für n Parametersätze gleichzeitig fort.
+    theta: (n, len(parameter)) – Werte der angepassten Parameter, übrige aus params.
+    Ergebnis: (n, len(REIHEN), n_jahre), ohne Ganzzahl-Rundung (stetig für Least Squares).
+    Eigene Fassung der Schrittlogik von build_projection_batch(); tests/test_calibration.py
+    prüft, dass beide über einen Vorwärts-Horizont übereinstimmen – Änderungen an der Engine hier nachziehen.
+    """
+    theta = np.atleast_2d(np.asarray(theta, dtype=float))
+    n = theta.shape[0]
+
+    def wert(key: str) -> np.ndarray:
+        if key in parameter:
+            return theta[:, parameter.index(key)]
+        return np.full(n, float(params.get(key) or 0))
+
+    neu_fw = wert("fernwaerme_anschluss_bis_2030")
+    heizungstausch = wert("heizungstausch_pro_jahr")
+    anteil_h2 = wert("anteil_gas_zu_wasserstoff") / 100.0
+    wp_jahr = wert("waermepumpen_pro_jahr")
+    wachstum = wert("wachstum_wohnungen_pro_jahr")
+    m_pro_anschluss = wert("fernwaerme_leitungen_m_pro_anschluss")
+
+    fw = np.full(n, float(start["fernwaerme_haushalte"]))
+    gas = np.full(n, float(start["gas_heizung_haushalte"]))
+    gesamt = np.full(n, float(start["gesamt_wohnungen"]))
+    leitungen = np.full(n, float(start["fernwaerme_leitungen_km"]))
+
+    out = np.empty((n, len(REIHEN), n_jahre))
+    out[:, :, 0] = np.stack([fw, gas, gesamt, leitungen], axis=1)
+    for t in range(1, n_jahre):
+        gesamt = gesamt * (1 + wachstum / 100.0)
+        fw = np.minimum(fw + neu_fw, gesamt)
+        gas_aus = np.minimum(gas, heizungstausch)
+        zu_h2 = gas_aus * anteil_h2
+        zu_wp = np.minimum(wp_jahr, np.maximum(0, gas_aus - zu_h2))
+        zu_sonstige = np.maximum(0, gas_aus - zu_h2 - zu_wp)
+        gas = np.maximum(0, gas - gas_aus)
+        fw = np.minimum(fw + zu_sonstige, gesamt)
+        leitungen = leitungen + neu_fw * m_pro_anschluss / 1000.0
+        out[:, :, t] = np.stack([fw, gas, gesamt, leitungen], axis=1)
+    return out
+
+
+def kalibrieren(
+    df_hist: pd.DataFrame,
+    params: dict | None = None,
+    parameter: list | None = None,
+    max_iter: int = 100,
+    tol: float = 1e-10,
+) -> dict:
+    """
+    Passt die Parameter per Levenberg-Marquardt an die Historie (jahr <= BASISJAHR) an.
+    Residuen werden je Reihe auf deren Mittelwert normiert, damit Haushalte und km
+    vergleichbar gewichtet sind.
+    Ergebnis: params (kalibriert), werte, rmse (je Reihe, absolute Einheiten),
+              residuen (jahr × Reihe, Beobachtung − Modell), iterationen
+    """
+    params = dict(params if params is not None else default_params())
+    parameter = list(parameter if parameter is not None else KALIBRIER_PARAMETER)
+
+    obs = df_hist[df_hist["jahr"] <= BASISJAHR].sort_values("jahr")
+    jahre = obs["jahr"].to_numpy()
+    idx = jahre - jahre[0]
+    n_jahre = int(idx[-1]) + 1
+    y = obs[REIHEN].to_numpy(dtype=float).T  # (Reihen, Jahre)
+    skala = np.abs(y).mean(axis=1, keepdims=True)
+    skala[skala == 0] = 1.0
+    start = obs.iloc[0]
+
+    # Optimierung in normierten Koordinaten x = theta / theta0
+    theta0 = np.array([float(params.get(k) or 0) for k in parameter])
+    norm = np.where(theta0 != 0, np.abs(theta0), 1.0)
+
+    def residuen(x: np.ndarray) -> np.ndarray:
+        sim = rueckrechnung(x * norm, parameter, params, start, n_jahre)[:, :, idx]
+        return ((y - sim) / skala).reshape(x.shape[0], -1)
+
+    k = len(parameter)
+    x = theta0 / norm
+    r = residuen(x[None, :])[0]
+    kosten = float(r @ r)
+    lam = 1e-3
+    h = 1e-6
+    iterationen = 0
+    for iterationen in range(1, max_iter + 1):
+        # Jacobi-Matrix: ein Batch mit k gestörten Parametersätzen
+        R = residuen(x + h * np.eye(k))
+        J = (R - r) / h  # (k, m)
+        A = J @ J.T
+        g = J @ r
+        diag = np.diag(np.diag(A)) + 1e-12 * np.eye(k)
+
+        # Mehrere Dämpfungen gleichzeitig auswerten, beste übernehmen
+        lams = lam * np.array([0.1, 1.0, 10.0])
+        schritte = np.stack([np.linalg.solve(A + l * diag, -g) for l in lams])
+        kandidaten = np.maximum(x + schritte, 0)
+        R_k = residuen(kandidaten)
+        kosten_k = np.einsum("ij,ij->i", R_k, R_k)
+        best = int(np.argmin(kosten_k))
+
+        if kosten_k[best] < kosten:
+            verbesserung = (kosten - kosten_k[best]) / max(kosten, 1e-300)
+            x, r, kosten = kandidaten[best], R_k[best], float(kosten_k[best])
+            lam = lams[best]
+            if verbesserung < tol:
+                break
+        else:
+            lam *= 100
+            if lam > 1e12:
+                break
+
+    werte = dict(zip(parameter, (x * norm).tolist()))
+    for key, val in werte.items():
+        params[key] = int(round(val)) if key in _GANZZAHLIG else round(val, 3)
+
+    res = pd.DataFrame((r.reshape(len(REIHEN), -1) * skala).T, columns=REIHEN)
+    res.insert(0, "jahr", jahre)
+    rmse = {reihe: float(np.sqrt((res[reihe] ** 2).mean())) for reihe in REIHEN}
+
+    return {
+        "params": params,
+        "werte": werte,
+        "rmse": rmse,
+        "residuen": res,
+        "iterationen": iterationen,
+    }
+
+
+def kalibriertes_szenario(df_hist: pd.DataFrame, params: dict | None = None, name: str = "Kalibriertes Szenario") -> dict:
+    """Szenario-Eintrag (wie in der App) mit kalibrierten Raten und Residuen der Anpassung."""
+    kal = kalibrieren(df_hist, params)
+    proj = build_projection(kal["params"], df_hist)
+    return {
+        "name": name,
+        "params": kal["params"],
+        "proj": proj,
+        "jahr_dekarbonisierung": jahr_dekarbonisierung(proj),
+        "kalibrierung": kal,
+    }
@@ -4,8 +4,29 @@ Hier alle Konstanten, Parameter-Defaults und Gebäudetypen anpassen.
 """
 
 BASISJAHR = 2023
-ZIELJAHR = 2040
+ZIELJAHR = 2040  # Standard-Horizont; pro Szenario über params["zieljahr"] änderbar
+ZIELJAHR_MAX = 2060  # spätestes wählbares Zieljahr (Regler, Horizont der Antwortfläche)
 KORRIDOR_RELATIV = 0.12  # ±12 % Schwankungsbreite bei Projektionen
+UMSTELLJAHR = 2030  # Standard-Stützstelle: Anschlussrate "bis 2030" gilt bis einschließlich dieses Jahres
+
+# Zeitschritte (Schritte pro Jahr)
+ZEITSCHRITTE = {"jahr": 1, "quartal": 4, "monat": 12}
+
+# Saisonale Ausbauprofile (Monatsgewichte Jan–Dez, Summe 1); Quartale = Summe je 3 Monate
+SAISONPROFILE = {
+    "gleichmaessig": [1 / 12] * 12,
+    "bausaison": [0.04, 0.04, 0.06, 0.09, 0.11, 0.12, 0.12, 0.12, 0.11, 0.09, 0.06, 0.04],
+}
+
+# Kostenmodell (core/costs.py)
+DISKONTSATZ = 0.03  # realer Zinssatz für den Kapitalwert (NPV)
+
+# Geteilter Ergebnis-Cache (core/cache.py)
+CACHE_MAX_EINTRAEGE = 512  # Einträge im Speicher pro Prozess
+CACHE_MAX_MB = 256  # Größengrenze der optionalen SQLite-Datei
+
+# Live-Vorschau der KPIs aus der vorberechneten Antwortfläche (core/response_surface.py)
+VORSCHAU_AKTIV = True
 
 # Gebäudetypen (key, label) – für Dekarbonisierungspfade
 GEBAEUDETYPEN = [
@@ -26,6 +47,17 @@ GEBIETSTYPEN = [
     ("lokale_individuell", "Lokale Wärme individuell", "WP, Solar, Biomasse"),
 ]
 
+# Ausbauparameter-Regler (key, widget_key, label, min, max, step) – App und Antwortfläche
+AUSBAU_REGLER = [
+    ("fernwaerme_anschluss_bis_2030", "fw30", "FW-Anschlüsse/Jahr bis 2030", 5_000, 25_000, 1_000),
+    ("fernwaerme_anschluss_ab_2030", "fw40", "FW-Anschlüsse/Jahr ab 2030", 15_000, 45_000, 1_000),
+    ("heizungstausch_pro_jahr", "ht", "Heizungstausch/Jahr", 5_000, 35_000, 1_000),
+    ("anteil_gas_zu_wasserstoff", "h2", "Anteil Gas → H2 (%)", 0, 40, 5),
+    ("waermepumpen_pro_jahr", "wp", "Wärmepumpen/Jahr", 1_000, 15_000, 500),
+    ("kochgas_austausch_pro_jahr", "kg", "Kochgas-Austausch/Jahr", 5_000, 25_000, 1_000),
+    ("wachstum_wohnungen_pro_jahr", "wg", "Wachstum Wohnungen (%/Jahr)", 0.0, 1.5, 0.1),
+]
+
 
 def default_params() -> dict:
     """Standard-Parameter für ein neues Szenario. Hier Logik anpassen."""
@@ -38,6 +70,11 @@ def default_params() -> dict:
         "waermepumpen_pro_jahr": 4_000,
         "kochgas_austausch_pro_jahr": 12_000,
         "wachstum_wohnungen_pro_jahr": 0.4,
+        "fernwaerme_leitungen_m_pro_anschluss": 2_500 / 1_500,  # 2,5 km je 1.500 Anschlüsse
+        # Zeitachse
+        "zieljahr": ZIELJAHR,
+        "zeitschritt": "jahr",  # "jahr" | "quartal" | "monat"
+        "saisonprofil": "bausaison",  # Name aus SAISONPROFILE oder Liste von Gewichten
         # Gas-Zählpunkte pro Gebäudetyp
         "gas_zaehlpunkte_einfamilienhauser": 25_000,
         "gas_zaehlpunkte_zentral_beheizt": 420_000,
@@ -0,0 +1,143 @@
+"""
+Kostenmodell: Investitionen (Capex), Betriebskosten (Opex) und Kapitalwert je Szenario.
+
+Stückkosten stehen in data/kosten_einheiten.csv (eine Zeile je Position, bezogen auf eine
+Metrik der Projektion) und data/kosten_gebaeudetypen.csv (Umstellungskosten je Gas-Zählpunkt).
+Preise folgen einer Lernkurve (Wright): je Verdopplung der kumulierten Menge sinkt der
+Stückpreis um lernrate_pct, höchstens bis preisuntergrenze_pct des Ausgangspreises.
+
+Alle Funktionen rechnen auf Arrays (Szenarien × Zeitschritte) – direkt auf der Ausgabe von
+build_projection_batch() oder auf einem/mehreren ProjectionResult.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .config import BASISJAHR, DISKONTSATZ, GEBAEUDETYPEN
+from .data_loader import DATA_DIR
+from .result import ProjectionResult
+
+KOSTEN_DATEI = DATA_DIR / "kosten_einheiten.csv"
+KOSTEN_TYPEN_DATEI = DATA_DIR / "kosten_gebaeudetypen.csv"
+
+
+@lru_cache(maxsize=None)
+def _standard_kosten() -> pd.DataFrame:
+    return pd.read_csv(KOSTEN_DATEI)
+
+
+@lru_cache(maxsize=None)
+def _standard_kosten_typen() -> pd.DataFrame:
+    return pd.read_csv(KOSTEN_TYPEN_DATEI)
+
+
+def _als_batch(res) -> tuple[dict, np.ndarray, np.ndarray, int]:
+    """Batch-Dict oder ProjectionResult → (Metrik → (n, Schritte) float64, jahr, zeit, perioden)."""
+    if isinstance(res, ProjectionResult):
+        # Rohdaten statt res[...]: keine Ausgabe-Rundung (z.B. Leitungs-km) in den Kosten
+        reihen = {s: res.daten[i][None, :].astype(np.float64) for i, s in enumerate(res.spalten)}
+        return reihen, res.jahre, res.zeit, res.perioden
+    reihen = {k: np.atleast_2d(np.asarray(v, dtype=np.float64)) for k, v in res.items() if k not in ("jahr", "zeit", "perioden")}
+    return reihen, np.asarray(res["jahr"]), np.asarray(res["zeit"]), int(res.get("perioden", 1))
+
+
+def preisindex(kum_vorher: np.ndarray, bestand_basis: float, lernrate_pct: float, untergrenze_pct: float = 0.0) -> np.ndarray:
+    """
+    Stückpreis relativ zum Ausgangspreis nach der Lernkurve:
+    ((bestand_basis + kum_vorher) / bestand_basis) ^ log2(1 − lernrate), nach unten begrenzt.
+    """
+    if not lernrate_pct or not bestand_basis:
+        return np.ones_like(kum_vorher)
+    b = np.log2(1 - lernrate_pct / 100.0)
+    index = ((bestand_basis + kum_vorher) / bestand_basis) ** b
+    return np.maximum(index, (untergrenze_pct or 0) / 100.0)
+
+
+def kostenstroeme(res, kosten: pd.DataFrame | None = None) -> dict:
+    """
+    Kostenströme je Zeitschritt nach BASISJAHR (EUR, nominal zu heutigen Preisen).
+    res: build_projection_batch()-Ergebnis oder ProjectionResult (aggregiert).
+    Zugänge sind positive Änderungen der Metrik je Schritt; Opex wird je Schritt anteilig
+    (1/perioden) auf kumulierte Zugänge (basis "zugang") bzw. den Bestand (basis "bestand") erhoben.
+    Ergebnis: jahr, zeit (Schritte,) · capex, opex (Position → (n, Schritte)) · gesamt (n, Schritte)
+    """
+    kosten = _standard_kosten() if kosten is None else kosten
+    reihen, jahr, zeit, perioden = _als_batch(res)
+
+    capex, opex = {}, {}
+    for pos in kosten.itertuples(index=False):
+        if pos.metrik not in reihen:
+            raise KeyError(f"Kostenposition {pos.position!r}: Metrik {pos.metrik!r} fehlt in der Projektion")
+        reihe = reihen[pos.metrik]
+        if pos.basis == "bestand":
+            capex[pos.position] = np.zeros_like(reihe[:, 1:])
+            opex[pos.position] = reihe[:, 1:] * (pos.opex_eur_jahr / perioden)
+            continue
+        zugang = np.maximum(0, np.diff(reihe, axis=1))
+        kum = np.cumsum(zugang, axis=1)
+        index = preisindex(kum - zugang, pos.bestand_basis, pos.lernrate_pct, pos.preisuntergrenze_pct)
+        capex[pos.position] = zugang * (pos.capex_eur * index)
+        opex[pos.position] = kum * (pos.opex_eur_jahr / perioden)
+
+    gesamt = sum(capex.values()) + sum(opex.values())
+    return {"jahr": jahr[1:], "zeit": zeit[1:], "capex": capex, "opex": opex, "gesamt": gesamt}
+
+
+def kostenstroeme_nach_typ(res_typ, kosten_typen: pd.DataFrame | None = None) -> dict:
+    """
+    Umstellungs-Capex je Gebäudetyp: entfallene Gas-Zählpunkte × Kosten je Zählpunkt.
+    res_typ: ein build_projection_by_type()-Ergebnis oder eine Liste davon (gleiche Zeitachse).
+    Ergebnis: jahr, zeit (Schritte,) · typen · capex (n, Typen, Schritte) · gesamt (n, Schritte)
+    """
+    kosten_typen = _standard_kosten_typen() if kosten_typen is None else kosten_typen
+    liste = [res_typ] if isinstance(res_typ, ProjectionResult) else list(res_typ)
+    erstes = liste[0]
+    daten = np.stack([r.daten for r in liste]).astype(np.float64)  # (n, Typen, Schritte + 1)
+
+    # Spalten sind Typ-Labels, die Kosten-Tabelle ist nach Typ-Schlüssel (GEBAEUDETYPEN)
+    label_zu_key = {label: key for key, label, _ in GEBAEUDETYPEN}
+    je_typ = dict(zip(kosten_typen["typ"], kosten_typen["capex_eur_pro_zaehlpunkt"]))
+    preis = np.array([float(je_typ.get(label_zu_key.get(s, s), 0)) for s in erstes.spalten])
+
+    capex = np.maximum(0, -np.diff(daten, axis=2)) * preis[None, :, None]
+    return {
+        "jahr": erstes.jahre[1:],
+        "zeit": erstes.zeit[1:],
+        "typen": erstes.spalten,
+        "capex": capex,
+        "gesamt": capex.sum(axis=1),
+    }
+
+
+def diskontfaktoren(zeit: np.ndarray, zinssatz=DISKONTSATZ) -> np.ndarray:
+    """(1 + r)^-(zeit − BASISJAHR); zinssatz als Zahl oder je Szenario (n,) → (n, Schritte)."""
+    r = np.asarray(zinssatz, dtype=np.float64)
+    t = np.asarray(zeit, dtype=np.float64) - BASISJAHR
+    return (1 + r[..., None]) ** -t if r.ndim else (1 + r) ** -t
+
+
+def kapitalwert(stroeme, zinssatz=DISKONTSATZ, bis_jahr: int | None = None) -> np.ndarray:
+    """
+    Kapitalwert (NPV) je Szenario: Summe der diskontierten Kosten über alle (bzw. bis bis_jahr) Schritte.
+    stroeme: Ergebnis von kostenstroeme() oder kostenstroeme_nach_typ().
+    zinssatz: Zahl oder je Szenario (n,), z.B. für Monte-Carlo-Läufe.
+    bis_jahr: nur Schritte bis einschließlich dieses Jahres (gemeinsamer Horizont für Vergleiche).
+    Ergebnis: (n,) EUR
+    """
+    faktoren = diskontfaktoren(stroeme["zeit"], zinssatz)
+    if bis_jahr is not None:
+        faktoren = faktoren * (np.asarray(stroeme["jahr"]) <= bis_jahr)
+    return np.einsum("...t,...t->...", np.atleast_2d(stroeme["gesamt"]), faktoren)
+
+
+def jaehrliche_kosten(stroeme: dict) -> pd.DataFrame:
+    """Kosten je Jahr (Schritte summiert) für ein Szenario als DataFrame: jahr, capex, opex, gesamt."""
+    jahr = stroeme["jahr"]
+    capex = sum(v[0] for v in stroeme["capex"].values())
+    opex = sum(v[0] for v in stroeme["opex"].values())
+    df = pd.DataFrame({"jahr": jahr.astype(np.int64), "capex_eur": capex, "opex_eur": opex})
+    df = df.groupby("jahr", as_index=False).sum()
+    df["gesamt_eur"] = df["capex_eur"] + df["opex_eur"]
+    return df
@@ -18,6 +18,10 @@ def load_data() -> dict:
         result["quellen"] = pd.read_csv(DATA_DIR / "waermeversorgung_quellen.csv")
     if (DATA_DIR / "pioniergebiete.csv").exists():
         result["pioniergebiete"] = pd.read_csv(DATA_DIR / "pioniergebiete.csv")
+    if (DATA_DIR / "kosten_einheiten.csv").exists():
+        result["kosten"] = pd.read_csv(DATA_DIR / "kosten_einheiten.csv")
+    if (DATA_DIR / "kosten_gebaeudetypen.csv").exists():
+        result["kosten_typen"] = pd.read_csv(DATA_DIR / "kosten_gebaeudetypen.csv")
     if (DATA_DIR / "ziele_raus_aus_gas.json").exists():
         with open(DATA_DIR / "ziele_raus_aus_gas.json", encoding="utf-8") as f:
             result["ziele"] = json.load(f)
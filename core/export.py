@@ -0,0 +1,375 @@
+"""
+Export und Import von Szenario-Sätzen als Arrow IPC (.arrow) oder Parquet (.parquet).
+
+Ein Export ist ein Verzeichnis mit bis zu vier Tabellen (lange Form, eine Zeile je
+Szenario und Zeitschritt, eine Spalte je Metrik bzw. Gebäudetyp):
+
+- szenarien   – Name, Parameter (JSON und skalare Parameter als Spalten), Dekarbonisierungsjahr, Kapitalwert
+- projektion  – aggregierte Projektion (build_projection)
+- nach_typ    – Gas-Zählpunkte je Gebäudetyp (build_projection_by_type)
+- korridor    – untere/obere Korridor-Projektion (grenze = "unten"/"oben")
+
+Gelesen wird per Memory-Map: Arrow-Dateien ohne Kopie (Spalten sind Views auf die Datei),
+Parquet ohne CSV-Parsing. als_batch() liefert Spalten wie build_projection_batch() als
+(Szenarien × Schritte)-Arrays, z.B. direkt für kostenstroeme().
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .cache import daten_hash, korridor, projektion_by_type
+from .config import BASISJAHR, GEBAEUDETYPEN, KORRIDOR_RELATIV
+from .costs import kapitalwert, kostenstroeme
+from .result import ProjectionResult
+from .scenario_engine import METRIKEN, build_projection_batch, build_projection_by_type, jahr_dekarbonisierung, jahr_dekarbonisierung_batch
+
+FORMATE = {"arrow": ".arrow", "parquet": ".parquet"}
+TABELLEN = ["szenarien", "projektion", "nach_typ", "korridor"]
+EXPORT_VERSION = 1
+META_KEY = b"raus_aus_gas"
+GRENZEN = ["unten", "oben"]
+
+# Spalten der Typ-Tabelle: Typ-Schlüssel (statt Labels mit Leer- und Sonderzeichen)
+_TYP_KEY = {label: key for key, label, _ in GEBAEUDETYPEN}
+_TYP_LABEL = {key: label for key, label, _ in GEBAEUDETYPEN}
+_SCHLUESSEL = {"szenario", "jahr", "zeit", "grenze", "faktor"}
+
+
+# ==================== Export ====================
+
+def exportieren(
+    szenarien: list,
+    pfad: str | Path,
+    df_hist: pd.DataFrame | None = None,
+    format: str = "arrow",
+    nach_typ: bool = True,
+    mit_korridor: bool = True,
+) -> Path:
+    """
+    Exportiert Szenario-Einträge (wie in der App: name, params, proj) in das Verzeichnis pfad.
+    Typ-Pfade und Korridore kommen aus dem Eintrag (importierte Szenarien) oder dem geteilten
+    Cache (Korridor nur mit df_hist).
+    """
+    n = len(szenarien)
+    if n == 0:
+        raise ValueError("Keine Szenarien zum Exportieren")
+    projs = [sz["proj"] for sz in szenarien]
+    params = [sz["params"] for sz in szenarien]
+    stroeme = [kostenstroeme(p) for p in projs]
+    tabellen = {
+        "szenarien": _szenarien_tabelle(
+            [sz["name"] for sz in szenarien],
+            [_params_json(p) for p in params],
+            _param_spalten(params, n),
+            [sz.get("jahr_dekarbonisierung") for sz in szenarien],
+            [p.perioden for p in projs],
+            [float(kapitalwert(s)[0]) for s in stroeme],
+        ),
+        "projektion": _lange_tabelle(projs),
+    }
+    if nach_typ:
+        typen = [sz.get("proj_typ") or projektion_by_type(sz["params"]) for sz in szenarien]
+        tabellen["nach_typ"] = _lange_tabelle(typen, typ=True)
+    if mit_korridor and df_hist is not None:
+        paare = [sz.get("korridor") or korridor(sz["params"], df_hist) for sz in szenarien]
+        tabellen["korridor"] = _lange_tabelle([r for paar in paare for r in paar], grenzen=n)
+    return _schreiben(pfad, format, tabellen, df_hist)
+
+
+def exportieren_batch(
+    params: dict,
+    df_hist: pd.DataFrame,
+    pfad: str | Path,
+    namen: list | None = None,
+    format: str = "arrow",
+    nach_typ: bool = False,
+    mit_korridor: bool = True,
+) -> Path:
+    """
+    Exportiert einen Szenario-Batch (params mit Arrays (n,) wie für build_projection_batch())
+    ohne Umweg über einzelne Szenario-Einträge, z.B. Ergebnisse einer Monte-Carlo-Rechnung.
+    nach_typ rechnet build_projection_by_type() je Szenario (nicht vektorisiert, daher optional).
+    """
+    res = build_projection_batch(params, df_hist)
+    n = res[METRIKEN[0]].shape[0]
+    params_json, param_spalten = _batch_params(params, n)
+    jd = jahr_dekarbonisierung_batch(res["gas_heizung_haushalte"], res["jahr"])
+    tabellen = {
+        "szenarien": _szenarien_tabelle(
+            namen or [f"Szenario {i + 1}" for i in range(n)],
+            params_json,
+            param_spalten,
+            [None if np.isnan(j) else int(j) for j in jd],
+            [res["perioden"]] * n,
+            kapitalwert(kostenstroeme(res)).tolist(),
+        ),
+        "projektion": _batch_tabelle(res, n),
+    }
+    if nach_typ:
+        tabellen["nach_typ"] = _lange_tabelle([build_projection_by_type(json.loads(p)) for p in params_json], typ=True)
+    if mit_korridor:
+        unten = build_projection_batch(params, df_hist, faktor=1.0 - KORRIDOR_RELATIV)
+        oben = build_projection_batch(params, df_hist, faktor=1.0 + KORRIDOR_RELATIV)
+        tabellen["korridor"] = _batch_tabelle(res, n, grenzen=(unten, oben))
+    return _schreiben(pfad, format, tabellen, df_hist)
+
+
+def _batch_params(params: dict, n: int) -> tuple[list, dict]:
+    """
+    Parameter je Szenario aus einem Batch-Dict (Arrays (n,) → Zahl): JSON je Szenario und
+    skalare Parameter als Spalten. Konstante Parameter werden nur einmal umgewandelt.
+    """
+    variabel = {k: v for k, v in params.items() if isinstance(v, np.ndarray) and v.shape == (n,)}
+    basis = _json_werte({k: v for k, v in params.items() if k not in variabel})
+    werte = {k: v.tolist() for k, v in variabel.items()}
+    params_json = [_params_json(basis | {k: w[i] for k, w in werte.items()}) for i in range(n)]
+    spalten = _param_spalten([basis], n) | {k: pa.array(w) for k, w in werte.items()}
+    return params_json, spalten
+
+
+def _json_werte(x):
+    """Parameter JSON-tauglich machen (numpy → Python, Dict-Schlüssel als Text), Zahltypen bleiben erhalten."""
+    if isinstance(x, dict):
+        return {str(k): _json_werte(v) for k, v in x.items()}
+    if isinstance(x, (list, tuple)):
+        return [_json_werte(v) for v in x]
+    if isinstance(x, np.generic):
+        return x.item()
+    return x
+
+
+def _params_json(params: dict) -> str:
+    """
+    Parameter eines Szenarios als JSON. Bewusst nicht kanonisch(): dort wird 1.0 zu 1 (für
+    Cache-Schlüssel), die App braucht nach dem Import aber dieselben Typen wie vorher (Slider).
+    """
+    return json.dumps(_json_werte(params), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def _param_spalten(params: list, n: int) -> dict:
+    """Skalare Parameter als eigene Spalten (Filtern in BI-Tools ohne JSON); ein Dict gilt für alle n."""
+    spalten = {}
+    for key in dict.fromkeys(k for p in params for k in p):
+        werte = [p.get(key) for p in params]
+        if not all(w is None or isinstance(w, (int, float, str)) for w in werte):
+            continue
+        try:
+            spalten[key] = pa.array(werte * n if len(params) == 1 else werte)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            continue
+    return spalten
+
+
+def _szenarien_tabelle(namen: list, params_json: list, param_spalten: dict, jd: list, perioden: list, npv: list) -> pa.Table:
+    spalten = {
+        "szenario": pa.array(np.arange(len(namen), dtype=np.int32)),
+        "name": pa.array(namen, pa.string()),
+        "jahr_dekarbonisierung": pa.array(jd, pa.int32()),
+        "perioden": pa.array(perioden, pa.int32()),
+        "kapitalwert_eur": pa.array(npv, pa.float64()),
+        "params": pa.array(params_json, pa.string()),
+    }
+    return pa.table(spalten | {k: v for k, v in param_spalten.items() if k not in spalten})
+
+
+def _lange_tabelle(ergebnisse: list, typ: bool = False, grenzen: int | None = None) -> pa.Table:
+    """
+    ProjectionResults untereinander (lange Form). grenzen=n: Ergebnisse sind Paare
+    (unten, oben) je Szenario, Spalten grenze und faktor kommen hinzu.
+    """
+    laengen = np.array([len(r) for r in ergebnisse])
+    if grenzen is None:
+        szenario = np.repeat(np.arange(len(ergebnisse), dtype=np.int32), laengen)
+    else:
+        szenario = np.repeat(np.arange(grenzen, dtype=np.int32), laengen.reshape(-1, 2).sum(axis=1))
+    spalten = {
+        "szenario": szenario,
+        "jahr": np.concatenate([r.jahre for r in ergebnisse]),
+        "zeit": np.concatenate([r.zeit for r in ergebnisse]),
+    }
+    if grenzen is not None:
+        idx = np.repeat(np.tile(np.arange(2, dtype=np.int8), grenzen), laengen)
+        spalten["grenze"] = pa.DictionaryArray.from_arrays(idx, GRENZEN)
+        spalten["faktor"] = np.array([1.0 - KORRIDOR_RELATIV, 1.0 + KORRIDOR_RELATIV], dtype=np.float32)[idx]
+    erstes = ergebnisse[0]
+    for j, s in enumerate(erstes.spalten):
+        spalten[_TYP_KEY.get(s, s) if typ else s] = np.concatenate([r.daten[j] for r in ergebnisse])
+    return pa.table(spalten)
+
+
+def _batch_tabelle(res: dict, n: int, grenzen: tuple | None = None) -> pa.Table:
+    """Batch-Ergebnis (n, Schritte) je Metrik als lange Tabelle; grenzen=(unten, oben) für den Korridor."""
+    T = len(res["jahr"])
+    k = 1 if grenzen is None else 2
+    spalten = {
+        "szenario": np.repeat(np.arange(n, dtype=np.int32), k * T),
+        "jahr": np.tile(res["jahr"].astype(np.int32), n * k),
+        "zeit": np.tile(res["zeit"].astype(np.float64), n * k),
+    }
+    if grenzen is not None:
+        idx = np.tile(np.repeat(np.arange(2, dtype=np.int8), T), n)
+        spalten["grenze"] = pa.DictionaryArray.from_arrays(idx, GRENZEN)
+        spalten["faktor"] = np.array([1.0 - KORRIDOR_RELATIV, 1.0 + KORRIDOR_RELATIV], dtype=np.float32)[idx]
+    for m in METRIKEN:
+        if grenzen is None:
+            werte = res[m]
+        else:
+            werte = np.stack([grenzen[0][m], grenzen[1][m]], axis=1)  # (n, 2, T)
+        spalten[m] = werte.astype(np.float32).reshape(-1)
+    return pa.table(spalten)
+
+
+def _schreiben(pfad: str | Path, format: str, tabellen: dict, df_hist: pd.DataFrame | None) -> Path:
+    if format not in FORMATE:
+        raise ValueError(f"Unbekanntes Format {format!r}, erlaubt: {list(FORMATE)}")
+    pfad = Path(pfad)
+    pfad.mkdir(parents=True, exist_ok=True)
+    meta = json.dumps({
+        "version": EXPORT_VERSION,
+        "basisjahr": BASISJAHR,
+        "hash_basis": daten_hash(df_hist) if df_hist is not None else None,
+        "korridor_relativ": KORRIDOR_RELATIV,
+    }).encode()
+    for name in TABELLEN:
+        for alt in FORMATE.values():  # keine Reste eines früheren Exports im anderen Format
+            (pfad / f"{name}{alt}").unlink(missing_ok=True)
+    for name, tabelle in tabellen.items():
+        tabelle = tabelle.replace_schema_metadata({META_KEY: meta}).combine_chunks()
+        datei = pfad / f"{name}{FORMATE[format]}"
+        if format == "arrow":
+            # Unkomprimiert und ein Record Batch: Spalten lassen sich ohne Kopie aus der Memory-Map lesen
+            with pa.OSFile(str(datei), "wb") as sink, pa.ipc.new_file(sink, tabelle.schema) as writer:
+                writer.write_table(tabelle, max_chunksize=max(tabelle.num_rows, 1))
+        else:
+            pq.write_table(tabelle, datei, compression="zstd")
+    return pfad
+
+
+# ==================== Import ====================
+
+def lesen(pfad: str | Path, tabelle: str = "projektion") -> pa.Table | None:
+    """Eine Tabelle des Exports per Memory-Map (None, wenn nicht exportiert)."""
+    pfad = Path(pfad)
+    if (pfad / f"{tabelle}.arrow").exists():
+        with pa.memory_map(str(pfad / f"{tabelle}.arrow"), "r") as quelle:
+            return pa.ipc.open_file(quelle).read_all()
+    if (pfad / f"{tabelle}.parquet").exists():
+        return pq.read_table(pfad / f"{tabelle}.parquet", memory_map=True)
+    return None
+
+
+def metadaten(tabelle: pa.Table) -> dict:
+    """Export-Metadaten (version, basisjahr, hash_basis, korridor_relativ) einer gelesenen Tabelle."""
+    roh = (tabelle.schema.metadata or {}).get(META_KEY)
+    if roh is None:
+        raise ValueError("Keine Raus-aus-Gas-Exportdatei (Metadaten fehlen)")
+    meta = json.loads(roh)
+    if meta["version"] > EXPORT_VERSION:
+        raise ValueError(f"Exportversion {meta['version']} ist neuer als unterstützt ({EXPORT_VERSION})")
+    return meta
+
+
+def _numpy(spalte: pa.ChunkedArray) -> np.ndarray:
+    """Spalte als numpy-Array – ohne Kopie, wenn möglich (ein Chunk, keine Nullwerte)."""
+    if isinstance(spalte.type, pa.DictionaryType):
+        spalte = pa.chunked_array([c.indices for c in spalte.chunks], spalte.type.index_type)
+    if spalte.num_chunks == 1 and spalte.null_count == 0:
+        return spalte.chunk(0).to_numpy(zero_copy_only=True)
+    return spalte.to_numpy()
+
+
+def als_batch(tabelle: pa.Table) -> dict:
+    """
+    Lange Tabelle (projektion, nach_typ, korridor) als Dict wie build_projection_batch():
+    jahr, zeit (Schritte,), perioden und je Metrik/Typ ein Array (n, Schritte) bzw. beim
+    Korridor (n, 2, Schritte). Setzt gleiche Zeitachse für alle Szenarien voraus; Arrow-Spalten
+    sind dann Views auf die Memory-Map.
+    """
+    szenario = _numpy(tabelle.column("szenario"))
+    n = int(szenario[-1]) + 1 if len(szenario) else 0
+    form = (n, 2, -1) if "grenze" in tabelle.column_names else (n, -1)
+    if n == 0 or len(szenario) % n or not np.array_equal(szenario.reshape(n, -1)[:, 0], np.arange(n)):
+        raise ValueError("als_batch() braucht für alle Szenarien dieselbe Zeitachse")
+    jahr = _numpy(tabelle.column("jahr")).reshape(form)
+    zeit = _numpy(tabelle.column("zeit")).reshape(form)
+    erste = (0, 0) if len(form) == 3 else (0,)
+    jahre = jahr[erste]
+    res = {"jahr": jahre, "zeit": zeit[erste], "perioden": int(np.sum(jahre == jahre[-1]))}
+    for name in tabelle.column_names:
+        if name not in _SCHLUESSEL:
+            res[name] = _numpy(tabelle.column(name)).reshape(form)
+    return res
+
+
+def _ergebnisse(tabelle: pa.Table | None, perioden: np.ndarray, typ: bool = False) -> list:
+    """Lange Tabelle → ProjectionResult je Szenario (bzw. Paare (unten, oben) beim Korridor)."""
+    if tabelle is None:
+        return [None] * len(perioden)
+    szenario = _numpy(tabelle.column("szenario"))
+    grenzen = np.searchsorted(szenario, np.arange(len(perioden) + 1))
+    jahr = _numpy(tabelle.column("jahr"))
+    zeit = _numpy(tabelle.column("zeit"))
+    grenze = _numpy(tabelle.column("grenze")) if "grenze" in tabelle.column_names else None
+    namen = [c for c in tabelle.column_names if c not in _SCHLUESSEL]
+    werte = [_numpy(tabelle.column(c)) for c in namen]
+    spalten = [_TYP_LABEL.get(c, c) for c in namen] if typ else namen
+    art = {"achse": "typ", "wert_name": "gas_verbleibend"} if typ else {}
+
+    def ergebnis(zeilen, p):
+        daten = np.stack([w[zeilen] for w in werte])
+        return ProjectionResult(jahr[zeilen], spalten, daten, perioden=p, zeit=zeit[zeilen], **art)
+
+    liste = []
+    for i, p in enumerate(perioden):
+        a, b = grenzen[i], grenzen[i + 1]
+        if grenze is None:
+            liste.append(ergebnis(slice(a, b), p))
+        else:
+            liste.append(tuple(ergebnis(a + np.flatnonzero(grenze[a:b] == g), p) for g in range(len(GRENZEN))))
+    return liste
+
+
+def importieren(pfad: str | Path) -> list:
+    """
+    Stellt Szenario-Einträge (name, params, proj, jahr_dekarbonisierung) aus einem Export her,
+    ohne neu zu rechnen. Mit exportierte Typ-Pfade und Korridore stehen unter proj_typ bzw.
+    korridor (sonst None), hash_basis nennt die Basisdaten des Exports – die App warnt, wenn sie
+    nicht zur geladenen Historie passen. Die importierten Ergebnisse gehören nur zu den
+    zurückgegebenen Einträgen und werden nicht in den geteilten Cache gelegt: eine (ggf.
+    bearbeitete) Datei darf keine Ergebnisse für andere Sitzungen liefern.
+    """
+    sz = lesen(pfad, "szenarien")
+    if sz is None:
+        raise FileNotFoundError(f"Kein Szenario-Export in {pfad}")
+    meta = metadaten(sz)
+    if meta["basisjahr"] != BASISJAHR:
+        raise ValueError(f"Export mit Basisjahr {meta['basisjahr']}, erwartet {BASISJAHR}")
+    tabelle = lesen(pfad, "projektion")
+    if tabelle is None:
+        raise ValueError(f"Export in {pfad} ohne Tabelle projektion")
+    perioden = _numpy(sz.column("perioden"))
+    projs = _ergebnisse(tabelle, perioden)
+    typen = _ergebnisse(lesen(pfad, "nach_typ"), perioden, typ=True)
+    paare = _ergebnisse(lesen(pfad, "korridor"), perioden)
+
+    eintraege = []
+    for name, params_json, proj, proj_typ, paar in zip(
+        sz.column("name").to_pylist(), sz.column("params").to_pylist(), projs, typen, paare
+    ):
+        if len(proj.jahre) < 2:
+            raise ValueError(f"Szenario {name!r} ohne Zeitschritte in der Tabelle projektion")
+        eintraege.append({
+            "name": name,
+            "params": json.loads(params_json),
+            "proj": proj,
+            "jahr_dekarbonisierung": jahr_dekarbonisierung(proj),
+            "proj_typ": proj_typ,
+            "korridor": paar,
+            "hash_basis": meta["hash_basis"],
+        })
+    return eintraege
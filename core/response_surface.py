@@ -0,0 +1,180 @@
+"""
+Vorberechnete Antwortfläche für die Ausbauparameter-Regler.
+
+Die Engine wird einmal (beim Start oder offline) über ein Raster des Regler-Raums
+ausgewertet (build_projection_batch); gespeichert werden nur die Kennzahlen für die
+Live-Vorschau in einem kompakten float32-Array. Abfragen interpolieren multilinear –
+exakt gerechnet wird erst beim Speichern eines Szenarios.
+
+Offline erzeugen:  python -m core.response_surface data/antwortflaeche.npz
+"""
+
+import itertools
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .cache import cache_key, daten_hash
+from .config import AUSBAU_REGLER, ZIELJAHR, ZIELJAHR_MAX, default_params
+from .data_loader import DATA_DIR, load_data
+from .scenario_engine import METRIKEN, build_projection_batch, jahr_dekarbonisierung_batch
+
+ANTWORTFLAECHE_DATEI = DATA_DIR / "antwortflaeche.npz"
+
+# Bei Änderungen an der Engine-Logik oder den Kennzahlen erhöhen: gespeicherte Flächen verfallen
+ANTWORTFLAECHE_VERSION = 3
+
+# Stützstellen je Regler (None = jede Reglerstufe). Regler ohne Einfluss auf die
+# Kennzahlen (Kochgas-Austausch) sind keine Dimension der Fläche.
+# Heizungstausch allein bestimmt Gas 2040 und Dekarbonisierungsjahr → volle Auflösung.
+STUETZSTELLEN = {
+    "fernwaerme_anschluss_bis_2030": 5,
+    "fernwaerme_anschluss_ab_2030": 7,
+    "heizungstausch_pro_jahr": None,
+    "anteil_gas_zu_wasserstoff": 5,
+    "waermepumpen_pro_jahr": 9,
+    "wachstum_wohnungen_pro_jahr": 7,
+}
+
+# Kennzahlen der Vorschau (letzte Achse des Arrays). Gerechnet wird bis ZIELJAHR_MAX, damit das
+# Dekarbonisierungsjahr für jedes wählbare Zieljahr vorliegt; FW-Anteil und Gas gelten für ZIELJAHR.
+KENNZAHLEN = ["fernwaerme_anteil_pct_2040", "gas_heizung_haushalte_2040", "jahr_dekarbonisierung"]
+
+
+def _achsen() -> dict:
+    achsen = {}
+    for key, _, _, lo, hi, step in AUSBAU_REGLER:
+        if key not in STUETZSTELLEN:
+            continue
+        n = STUETZSTELLEN[key]
+        if n is None:
+            achsen[key] = np.round(np.arange(lo, hi + step / 2, step), 6)
+        else:
+            achsen[key] = np.round(np.linspace(lo, hi, n), 6)
+    return achsen
+
+
+def signatur(achsen: dict, params: dict) -> str:
+    """Kennung einer Fläche: Version, Raster, Kennzahlen, Metriken und die festen Parameter."""
+    fest = {k: v for k, v in params.items() if k not in achsen}
+    raster = {k: np.asarray(v).tolist() for k, v in achsen.items()}
+    return cache_key("antwortflaeche", ANTWORTFLAECHE_VERSION, ZIELJAHR_MAX, raster, KENNZAHLEN, METRIKEN, fest)
+
+
+class Antwortflaeche:
+    """Kennzahlen auf einem regulären Raster der Regler; Abfrage per multilinearer Interpolation."""
+
+    def __init__(self, achsen: dict, werte: np.ndarray, hash_basis: str = "", signatur: str = ""):
+        self.achsen = achsen
+        self.werte = werte  # (*Rasterform, len(KENNZAHLEN)), float32
+        self.hash_basis = hash_basis
+        self.signatur = signatur
+
+    @classmethod
+    def berechnen(cls, df_hist: pd.DataFrame, params: dict | None = None, chunk: int = 20_000) -> "Antwortflaeche":
+        """Wertet die Engine über alle Rasterpunkte aus (in Blöcken von `chunk` Szenarien)."""
+        params = dict(params if params is not None else default_params())
+        achsen = _achsen()
+        keys = list(achsen)
+        form = tuple(len(a) for a in achsen.values())
+        gitter = np.stack(np.meshgrid(*achsen.values(), indexing="ij"), axis=-1).reshape(-1, len(keys))
+
+        werte = np.empty((gitter.shape[0], len(KENNZAHLEN)), dtype=np.float32)
+        for start in range(0, gitter.shape[0], chunk):
+            block = gitter[start:start + chunk]
+            p = dict(params, zieljahr=ZIELJAHR_MAX, zeitschritt="jahr")
+            p.update({k: block[:, j] for j, k in enumerate(keys)})
+            res = build_projection_batch(p, df_hist)
+            ziel = int(np.searchsorted(res["jahr"], ZIELJAHR, side="right")) - 1
+            werte[start:start + chunk, 0] = res["fernwaerme_anteil_pct"][:, ziel]
+            werte[start:start + chunk, 1] = res["gas_heizung_haushalte"][:, ziel]
+            werte[start:start + chunk, 2] = jahr_dekarbonisierung_batch(res["gas_heizung_haushalte"], res["jahr"])
+        return cls(achsen, werte.reshape(*form, len(KENNZAHLEN)), daten_hash(df_hist), signatur(achsen, params))
+
+    def speichern(self, pfad: str | Path = ANTWORTFLAECHE_DATEI) -> None:
+        arrays = {f"achse__{k}": v for k, v in self.achsen.items()}
+        np.savez_compressed(pfad, werte=self.werte, hash_basis=np.array(self.hash_basis), signatur=np.array(self.signatur), **arrays)
+
+    @classmethod
+    def laden(cls, pfad: str | Path = ANTWORTFLAECHE_DATEI) -> "Antwortflaeche":
+        with np.load(pfad) as f:
+            achsen = {k[len("achse__"):]: f[k] for k in f.files if k.startswith("achse__")}
+            sig = str(f["signatur"]) if "signatur" in f.files else ""  # Dateien ohne Signatur gelten als veraltet
+            return cls(achsen, f["werte"], str(f["hash_basis"]), sig)
+
+    def vorschau(self, params: dict) -> dict:
+        """
+        Kennzahlen für ein Parameter-Dict (Werte außerhalb des Rasters werden auf den Rand gesetzt).
+        Dekarbonisierungsjahr: None, wenn in einer beteiligten Rasterzelle bis ZIELJAHR_MAX nie
+        erreicht oder später als params["zieljahr"].
+        """
+        lo_idx, gewichte = [], []
+        for key, achse in self.achsen.items():
+            x = float(np.clip(params.get(key, achse[0]), achse[0], achse[-1]))
+            i = int(np.clip(np.searchsorted(achse, x, side="right") - 1, 0, len(achse) - 2))
+            lo_idx.append(i)
+            gewichte.append((x - achse[i]) / (achse[i + 1] - achse[i]))
+
+        ergebnis = np.zeros(len(KENNZAHLEN))
+        for ecke in itertools.product((0, 1), repeat=len(lo_idx)):
+            w = np.prod([g if e else 1 - g for e, g in zip(ecke, gewichte)])
+            if w == 0:
+                continue
+            ergebnis += w * self.werte[tuple(i + e for i, e in zip(lo_idx, ecke))]
+
+        jd = ergebnis[2]
+        zieljahr = int(params.get("zieljahr") or ZIELJAHR)
+        return {
+            "fernwaerme_anteil_pct_2040": round(float(ergebnis[0]), 1),
+            "gas_heizung_haushalte_2040": int(round(ergebnis[1])),
+            "jahr_dekarbonisierung": None if np.isnan(jd) or round(jd) > zieljahr else int(round(jd)),
+        }
+
+
+_flaeche = None
+_flaeche_lock = threading.Lock()
+_aufbau = None
+_aufbau_lock = threading.Lock()
+
+
+def _passt(f, df_hist: pd.DataFrame) -> bool:
+    return f is not None and f.hash_basis == daten_hash(df_hist) and f.signatur == signatur(_achsen(), default_params())
+
+
+def get_antwortflaeche(df_hist: pd.DataFrame, warten: bool = True) -> Antwortflaeche | None:
+    """
+    Prozessweite Antwortfläche: aus ANTWORTFLAECHE_DATEI, wenn sie zu den Basisdaten und zur
+    aktuellen Signatur (Version, Regler-Raster, Default-Parameter) passt, sonst berechnet.
+    warten=False: None, solange die Fläche noch fehlt – sie wird dann im Hintergrund aufgebaut.
+    """
+    global _flaeche
+    if _passt(_flaeche, df_hist):
+        return _flaeche
+    if not warten:
+        vorbereiten(df_hist)
+        return None
+    with _flaeche_lock:
+        if not _passt(_flaeche, df_hist):
+            flaeche = Antwortflaeche.laden(ANTWORTFLAECHE_DATEI) if ANTWORTFLAECHE_DATEI.exists() else None
+            _flaeche = flaeche if _passt(flaeche, df_hist) else Antwortflaeche.berechnen(df_hist)
+        return _flaeche
+
+
+def vorbereiten(df_hist: pd.DataFrame) -> None:
+    """Fläche in einem Hintergrund-Thread laden bzw. berechnen (beim Start der App), ohne Anfragen zu blockieren."""
+    global _aufbau
+    if _passt(_flaeche, df_hist):
+        return
+    with _aufbau_lock:
+        if _aufbau is None or not _aufbau.is_alive():
+            _aufbau = threading.Thread(target=get_antwortflaeche, args=(df_hist,), name="antwortflaeche", daemon=True)
+            _aufbau.start()
+
+
+if __name__ == "__main__":
+    pfad = Path(sys.argv[1]) if len(sys.argv) > 1 else ANTWORTFLAECHE_DATEI
+    Antwortflaeche.berechnen(load_data()["fernwaerme"]).speichern(pfad)
+    print(f"Antwortfläche gespeichert: {pfad}")
@@ -0,0 +1,110 @@
+"""
+Kompakter Ergebnistyp für Projektionen.
+
+ProjectionResult hält eine Projektion als zusammenhängendes int32/float32-Array mit
+beschrifteten Achsen (Jahr × Metrik bzw. Jahr × Gebäudetyp). Spalten sind Views ohne
+Kopie; ein DataFrame entsteht nur bei Bedarf (to_frame). Die Arrays sind schreibgeschützt,
+weil Ergebnisse über den Cache zwischen Sitzungen geteilt werden.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Metriken mit Nachkommastellen (Rundung bei Ausgabe); alle anderen sind ganzzahlig
+NACHKOMMASTELLEN = {
+    "fernwaerme_anteil_pct": 1,
+    "fernwaerme_leitungen_km": 0,
+}
+
+
+class ProjectionResult:
+    """
+    Projektion als Array (Spalten × Zeitschritte) mit Beschriftung.
+    jahre: (Schritte,) int32, Jahr jedes Schritts · spalten: Metrik- oder Typ-Namen ·
+    achse: Name der Spaltenachse · perioden: Schritte pro Jahr · zeit: Schrittende in Dezimaljahren
+    """
+
+    __slots__ = ("jahre", "spalten", "daten", "achse", "wert_name", "perioden", "zeit", "_index")
+
+    def __init__(self, jahre, spalten, daten: np.ndarray, achse: str = "metrik", wert_name: str = "wert", perioden: int = 1, zeit=None):
+        self.jahre = np.ascontiguousarray(jahre, dtype=np.int32)
+        self.spalten = tuple(spalten)
+        self.daten = np.ascontiguousarray(daten)  # (len(spalten), len(jahre)), jede Spalte zusammenhängend
+        self.achse = achse
+        self.wert_name = wert_name
+        self.perioden = int(perioden)
+        self.zeit = np.ascontiguousarray(self.jahre if zeit is None else zeit, dtype=np.float64)
+        self._index = {s: i for i, s in enumerate(self.spalten)}
+        self.jahre.setflags(write=False)
+        self.daten.setflags(write=False)
+        self.zeit.setflags(write=False)
+        if self.daten.shape != (len(self.spalten), len(self.jahre)):
+            raise ValueError(f"daten hat Form {self.daten.shape}, erwartet {(len(self.spalten), len(self.jahre))}")
+
+    def __reduce__(self):
+        return (ProjectionResult, (self.jahre, self.spalten, self.daten, self.achse, self.wert_name, self.perioden, self.zeit))
+
+    def __len__(self) -> int:
+        return len(self.jahre)
+
+    def __contains__(self, spalte: str) -> bool:
+        return spalte == "jahr" or spalte in self._index
+
+    def __getitem__(self, spalte: str) -> np.ndarray:
+        """Reihe über die Jahre: View für ganzzahlige Metriken, gerundete Kopie für Dezimal-Metriken."""
+        if spalte == "jahr":
+            return self.jahre
+        werte = self.daten[self._index[spalte]]
+        if spalte in NACHKOMMASTELLEN:
+            return np.round(werte.astype(np.float64), NACHKOMMASTELLEN[spalte])
+        return werte
+
+    def __repr__(self) -> str:
+        return f"ProjectionResult({self.jahre[0]}–{self.jahre[-1]} × {self.perioden}/Jahr, {self.achse}={list(self.spalten)}, {self.daten.dtype})"
+
+    @property
+    def empty(self) -> bool:
+        return len(self.jahre) == 0
+
+    @property
+    def nbytes(self) -> int:
+        return self.jahre.nbytes + self.daten.nbytes
+
+    def zeile(self, jahr: int) -> dict:
+        """Werte am Ende eines Jahres als Dict (Python-Zahlen, wie eine DataFrame-Zeile)."""
+        t = int(np.searchsorted(self.jahre, jahr, side="right")) - 1
+        if t < 0 or self.jahre[t] != jahr:
+            raise KeyError(jahr)
+        return {"jahr": int(jahr)} | {s: _python(s, self.daten[i, t]) for s, i in self._index.items()}
+
+    def jaehrlich(self) -> "ProjectionResult":
+        """Nur die Jahresend-Schritte (bei perioden == 1 das Ergebnis selbst)."""
+        if self.perioden == 1:
+            return self
+        idx = np.searchsorted(self.jahre, np.unique(self.jahre), side="right") - 1
+        return ProjectionResult(self.jahre[idx], self.spalten, self.daten[:, idx], self.achse, self.wert_name)
+
+    def to_frame(self, long: bool = False) -> pd.DataFrame:
+        """
+        DataFrame bei Bedarf: breit (jahr + eine Spalte je Metrik/Typ) oder
+        lang (jahr, <achse>, <wert_name>) wie die frühere Ausgabe von build_projection_by_type().
+        """
+        zeit = {} if self.perioden == 1 else {"zeit": self.zeit}
+        if long:
+            return pd.DataFrame({
+                "jahr": np.tile(self.jahre.astype(np.int64), len(self.spalten)),
+                **{k: np.tile(v, len(self.spalten)) for k, v in zeit.items()},
+                self.achse: np.repeat(self.spalten, len(self.jahre)),
+                self.wert_name: self.daten.reshape(-1).astype(np.int64 if self.daten.dtype.kind == "i" else np.float64),
+            }).sort_values(["zeit" if zeit else "jahr"], kind="stable").reset_index(drop=True)
+        df = pd.DataFrame({"jahr": self.jahre.astype(np.int64), **zeit})
+        for s in self.spalten:
+            werte = self[s]
+            df[s] = werte if s in NACHKOMMASTELLEN else werte.astype(np.int64)
+        return df
+
+
+def _python(spalte: str, wert):
+    if spalte in NACHKOMMASTELLEN:
+        return round(float(wert), NACHKOMMASTELLEN[spalte])
+    return int(wert)
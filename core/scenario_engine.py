@@ -3,74 +3,199 @@ Szenario-Rechner – Kernlogik für Projektionen.
 
 Diese Datei ist bewusst modular und gut anpassbar:
 - build_projection() – aggregierte Projektion Fernwärme vs. Gas
+- build_projection_batch() – wie build_projection(), vektorisiert über viele Szenarien
 - build_projection_by_type() – Pfade pro Gebäudetyp
+- zeitachse() – Horizont (params["zieljahr"]), Zeitschritt (Jahr/Quartal/Monat), Saisonprofil
+- Raten als Zahl oder Stützstellen {ab_jahr: wert}, z.B. params["fernwaerme_anschluss_pfad"]
 - Konstanten und Regeln (z.B. dezentral_verzögerung) hier anpassen
 """
 
+import numpy as np
 import pandas as pd
 
-from .config import BASISJAHR, ZIELJAHR, GEBAEUDETYPEN
+from .config import BASISJAHR, ZIELJAHR, UMSTELLJAHR, ZEITSCHRITTE, SAISONPROFILE, GEBAEUDETYPEN
+from .result import ProjectionResult
 
+# Ergebnis-Metriken von build_projection() (Reihenfolge der Spalten)
+METRIKEN = [
+    "fernwaerme_haushalte",
+    "gas_heizung_haushalte",
+    "gesamt_wohnungen",
+    "fernwaerme_anteil_pct",
+    "fernwaerme_leitungen_km",
+    "waermepumpen_umstellungen",  # kumuliert seit BASISJAHR
+    "wasserstoff_umstellungen",  # kumuliert seit BASISJAHR
+]
 
-def build_projection(params: dict, df_hist: pd.DataFrame, faktor: float = 1.0) -> pd.DataFrame:
+
+def zeitachse(params: dict) -> dict:
+    """
+    Zeitachse eines Szenarios: BASISJAHR (Ausgangszustand) plus Schritte bis params["zieljahr"].
+    Ergebnis: jahr/schritt je Schritt nach dem Basisjahr, perioden (Schritte pro Jahr),
+              kum/kum_vorher (kumulierter Saisonanteil der Jahresrate am Ende/Anfang des Schritts)
+    """
+    zeitschritt = params.get("zeitschritt") or "jahr"
+    if zeitschritt not in ZEITSCHRITTE:
+        raise ValueError(f"Unbekannter Zeitschritt {zeitschritt!r}, erlaubt: {list(ZEITSCHRITTE)}")
+    perioden = ZEITSCHRITTE[zeitschritt]
+    zieljahr = int(params.get("zieljahr") or ZIELJAHR)
+    n_jahre = max(0, zieljahr - BASISJAHR)
+
+    profil = _saisonprofil(params.get("saisonprofil"), perioden)
+    kum = np.cumsum(profil)
+    kum[-1] = 1.0
+    kum_vorher = np.concatenate([[0.0], kum[:-1]])
+    return {
+        "jahr": np.repeat(np.arange(BASISJAHR + 1, BASISJAHR + 1 + n_jahre), perioden),
+        "schritt": np.tile(np.arange(1, perioden + 1), n_jahre),
+        "perioden": perioden,
+        "kum": np.tile(kum, n_jahre),
+        "kum_vorher": np.tile(kum_vorher, n_jahre),
+    }
+
+
+def _saisonprofil(profil, perioden: int) -> np.ndarray:
+    """Gewichte je Schritt innerhalb eines Jahres (Summe 1); Monatsprofile werden auf Quartale summiert."""
+    if perioden == 1:
+        return np.ones(1)
+    if profil is None or isinstance(profil, str):
+        profil = SAISONPROFILE[profil or "gleichmaessig"]
+    w = np.asarray(profil, dtype=float)
+    if len(w) != perioden and len(w) % perioden == 0:
+        w = w.reshape(perioden, -1).sum(axis=1)
+    if len(w) != perioden:
+        raise ValueError(f"Saisonprofil mit {len(w)} Gewichten passt nicht zu {perioden} Schritten pro Jahr")
+    if not np.all(np.isfinite(w)) or np.any(w < 0) or w.sum() <= 0:
+        raise ValueError(f"Saisonprofil braucht endliche Gewichte >= 0 mit Summe > 0, erhalten: {list(profil)}")
+    return w / w.sum()
+
+
+def _rate(val, jahre: np.ndarray) -> np.ndarray:
     """
-    Projektion von BASISJAHR bis ZIELJAHR (aggregiert).
-    Ergebnis: jahr, fernwaerme_haushalte, gas_heizung_haushalte, gesamt_wohnungen,
-              fernwaerme_anteil_pct, fernwaerme_leitungen_km
+    Jahresrate je Schritt: Zahl bzw. Array (ein Wert je Szenario) → (n, 1),
+    Stützstellen {ab_jahr: wert} (stückweise konstant) → (1, Schritte).
+    """
+    if isinstance(val, dict):
+        ab = sorted(val, key=int)
+        idx = np.clip(np.searchsorted([int(k) for k in ab], jahre, side="right") - 1, 0, len(ab) - 1)
+        return np.array([float(val[k]) for k in ab])[idx][None, :]
+    return np.atleast_1d(np.asarray(0 if val is None else val, dtype=float))[:, None]
+
+
+def _fw_rate(params: dict, jahre: np.ndarray) -> np.ndarray:
+    """FW-Anschlüsse/Jahr: params["fernwaerme_anschluss_pfad"] oder bis/ab UMSTELLJAHR."""
+    if params.get("fernwaerme_anschluss_pfad"):
+        return _rate(params["fernwaerme_anschluss_pfad"], jahre)
+    bis = _rate(params.get("fernwaerme_anschluss_bis_2030", 12_000), jahre)
+    ab = _rate(params.get("fernwaerme_anschluss_ab_2030", 30_000), jahre)
+    return np.where(jahre <= UMSTELLJAHR, bis, ab)
+
+
+def _aufteilen(jahresrate: np.ndarray, achse: dict) -> np.ndarray:
+    """Jahresrate auf die Schritte verteilen (ganzzahlig, Jahressumme bleibt exakt erhalten)."""
+    return np.round(jahresrate * achse["kum"]) - np.round(jahresrate * achse["kum_vorher"])
+
+
+def build_projection(params: dict, df_hist: pd.DataFrame, faktor: float = 1.0) -> ProjectionResult:
+    """
+    Projektion von BASISJAHR bis params["zieljahr"] (aggregiert), gerechnet mit build_projection_batch().
+    Ergebnis (Zeit × Metrik, float32): fernwaerme_haushalte, gas_heizung_haushalte,
+              gesamt_wohnungen, fernwaerme_anteil_pct, fernwaerme_leitungen_km,
+              waermepumpen_umstellungen, wasserstoff_umstellungen (kumuliert)
+    """
+    res = build_projection_batch(params, df_hist, faktor=faktor)
+    daten = np.stack([res[m][0] for m in METRIKEN]).astype(np.float32)
+    return ProjectionResult(res["jahr"], METRIKEN, daten, achse="metrik", perioden=res["perioden"], zeit=res["zeit"])
+
+
+def build_projection_batch(params: dict, df_hist: pd.DataFrame, faktor: float = 1.0) -> dict:
+    """
+    Wie build_projection(), aber Parameterwerte dürfen Arrays gleicher Länge sein
+    (ein Szenario pro Element) und Raten Stützstellen {ab_jahr: wert}. Zieljahr,
+    Zeitschritt und Saisonprofil gelten für den ganzen Batch.
+    Vektorisiert über Szenarien und Zeit: Gas, Fernwärme (mit Obergrenze Wohnungen) und
+    Leitungen als kumulierte Summen; nur das abgerundete Wohnungswachstum läuft schrittweise.
+    Ergebnis: "jahr", "zeit" (Schritte,), "perioden" und je Metrik ein Array (Szenarien, Schritte).
     """
     base = df_hist[df_hist["jahr"] == BASISJAHR].iloc[0]
-    fw = int(base["fernwaerme_haushalte"])
-    gas = int(base["gas_heizung_haushalte"])
-    gesamt = int(base["gesamt_wohnungen"])
-    leitungen = float(base["fernwaerme_leitungen_km"])
-
-    def scale(x):
-        return int(round(x * faktor)) if isinstance(x, (int, float)) else x
-
-    anschluss_bis_2030 = scale(params.get("fernwaerme_anschluss_bis_2030", 12_000))
-    anschluss_ab_2030 = scale(params.get("fernwaerme_anschluss_ab_2030", 30_000))
-    heizungstausch = scale(params.get("heizungstausch_pro_jahr", 15_000))
-    anteil_h2 = (params.get("anteil_gas_zu_wasserstoff", 5) or 0) / 100.0
-    wp_jahr = scale(params.get("waermepumpen_pro_jahr", 4_000))
-    wachstum = params.get("wachstum_wohnungen_pro_jahr", 0.4)
-
-    rows = []
-    for jahr in range(BASISJAHR, ZIELJAHR + 1):
-        if jahr == BASISJAHR:
-            rows.append({
-                "jahr": jahr,
-                "fernwaerme_haushalte": fw,
-                "gas_heizung_haushalte": gas,
-                "gesamt_wohnungen": gesamt,
-                "fernwaerme_anteil_pct": round(100 * fw / gesamt, 1),
-                "fernwaerme_leitungen_km": leitungen,
-            })
-            continue
-
-        gesamt = int(gesamt * (1 + wachstum / 100.0))
-        neu_fw = anschluss_bis_2030 if jahr <= 2030 else anschluss_ab_2030
-        fw = min(fw + neu_fw, gesamt)
-        gas_aus = min(gas, heizungstausch)
-        zu_h2 = int(gas_aus * anteil_h2)
-        zu_wp = min(wp_jahr, max(0, gas_aus - zu_h2))
-        zu_sonstige = max(0, gas_aus - zu_h2 - zu_wp)
-        gas = max(0, gas - gas_aus)
-        fw = min(fw + zu_sonstige, gesamt)
-        leitungen = leitungen + (neu_fw / 1500.0) * 2.5
-        anteil = round(100 * fw / gesamt, 1) if gesamt else 0
-        rows.append({
-            "jahr": jahr,
-            "fernwaerme_haushalte": fw,
-            "gas_heizung_haushalte": gas,
-            "gesamt_wohnungen": gesamt,
-            "fernwaerme_anteil_pct": anteil,
-            "fernwaerme_leitungen_km": round(leitungen, 0),
-        })
-
-    return pd.DataFrame(rows)
-
-
-def build_projection_by_type(params: dict) -> pd.DataFrame:
+    achse = zeitachse(params)
+    jahre = achse["jahr"]
+    perioden = achse["perioden"]
+
+    def rate(key: str, default: float) -> np.ndarray:
+        return _rate(params.get(key, default), jahre)
+
+    def scale(x: np.ndarray) -> np.ndarray:
+        return np.round(x * faktor)
+
+    neu_fw = _aufteilen(scale(_fw_rate(params, jahre)), achse)
+    heizungstausch = _aufteilen(scale(rate("heizungstausch_pro_jahr", 15_000)), achse)
+    wp = _aufteilen(scale(rate("waermepumpen_pro_jahr", 4_000)), achse)
+    anteil_h2 = rate("anteil_gas_zu_wasserstoff", 5) / 100.0
+    wachstum = rate("wachstum_wohnungen_pro_jahr", 0.4)
+    m_pro_anschluss = rate("fernwaerme_leitungen_m_pro_anschluss", 2_500 / 1_500)
+    wachstum_schritt = 1 + wachstum / 100.0 if perioden == 1 else (1 + wachstum / 100.0) ** (1 / perioden)
+
+    n = max(x.shape[0] for x in (neu_fw, heizungstausch, wp, anteil_h2, wachstum, m_pro_anschluss))
+    form = (n, len(jahre))
+    neu_fw, heizungstausch, wp, anteil_h2, wachstum_schritt, m_pro_anschluss = (
+        np.broadcast_to(x, form) for x in (neu_fw, heizungstausch, wp, anteil_h2, wachstum_schritt, m_pro_anschluss)
+    )
+
+    fw0 = float(int(base["fernwaerme_haushalte"]))
+    gas0 = float(int(base["gas_heizung_haushalte"]))
+    leitungen0 = float(base["fernwaerme_leitungen_km"])
+
+    # Wohnungen: Abrundung je Schritt → einzige sequentielle Schleife
+    gesamt = np.empty((n, len(jahre) + 1))
+    gesamt[:, 0] = float(int(base["gesamt_wohnungen"]))
+    for t in range(len(jahre)):
+        gesamt[:, t + 1] = np.floor(gesamt[:, t] * wachstum_schritt[:, t])
+
+    # Gas: kumulierter Heizungstausch, Aufteilung auf H2 / Wärmepumpe / Rest (→ Fernwärme)
+    gas = np.concatenate([np.full((n, 1), gas0), np.maximum(0, gas0 - np.cumsum(heizungstausch, axis=1))], axis=1)
+    gas_aus = gas[:, :-1] - gas[:, 1:]
+    zu_h2 = np.floor(gas_aus * anteil_h2)
+    zu_wp = np.minimum(wp, np.maximum(0, gas_aus - zu_h2))
+    zu_sonstige = np.maximum(0, gas_aus - zu_h2 - zu_wp)
+
+    # Fernwärme: fw_t = min(fw_t-1 + zuwachs_t, gesamt_t)  ⇔  fw_t = C_t + min(fw0, min_k≤t (gesamt_k − C_k))
+    kum_zuwachs = np.cumsum(neu_fw + zu_sonstige, axis=1)
+    fw = kum_zuwachs + np.minimum.accumulate(np.minimum(fw0, gesamt[:, 1:] - kum_zuwachs), axis=1)
+    fw = np.concatenate([np.full((n, 1), fw0), fw], axis=1)
+
+    # Leitungen: gleiche Summationsreihenfolge wie schrittweise Fortschreibung
+    leitungen = np.cumsum(np.concatenate([np.full((n, 1), leitungen0), neu_fw * m_pro_anschluss / 1000.0], axis=1), axis=1)
+    leitungen[:, 1:] = np.round(leitungen[:, 1:], 0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        anteil = np.where(gesamt > 0, np.round(100 * fw / gesamt, 1), 0.0)
+    null = np.zeros((n, 1))
+
+    jahr = np.concatenate([[BASISJAHR], jahre])
+    schritt = np.concatenate([[perioden], achse["schritt"]])
+    return {
+        "jahr": jahr,
+        "zeit": jahr - 1 + schritt / perioden,
+        "perioden": perioden,
+        "fernwaerme_haushalte": fw,
+        "gas_heizung_haushalte": gas,
+        "gesamt_wohnungen": gesamt,
+        "fernwaerme_anteil_pct": anteil,
+        "fernwaerme_leitungen_km": leitungen,
+        "waermepumpen_umstellungen": np.concatenate([null, np.cumsum(zu_wp, axis=1)], axis=1),
+        "wasserstoff_umstellungen": np.concatenate([null, np.cumsum(zu_h2, axis=1)], axis=1),
+    }
+
+
+def jahr_dekarbonisierung_batch(gas: np.ndarray, jahre: np.ndarray, schwellwert: int = 0) -> np.ndarray:
+    """Wie jahr_dekarbonisierung() für (Szenarien, Jahre)-Arrays; NaN, wenn nie erreicht."""
+    erreicht = gas <= schwellwert
+    idx = erreicht.argmax(axis=1)
+    return np.where(erreicht.any(axis=1), jahre[idx], np.nan)
+
+
+def build_projection_by_type(params: dict) -> ProjectionResult:
     """
     Dekarbonisierungspfade pro Gebäudetyp (Gas-Zählpunkte verbleibend).
     Regeln (Wärmeplan 2040):
@@ -78,6 +203,9 @@ def build_projection_by_type(params: dict) -> pd.DataFrame:
     - Gas+FW: immer Fernwärme (zuerst)
     - Zentral: Rest-Fernwärme
     - Dezentral: erst nach Verzögerung
+    Zeitachse, Stützstellen und Saisonprofil wie build_projection(); jeder Bestand sinkt
+    um eine kumulierte Rate (vektorisiert über die Zeit).
+    Ergebnis: Zeit × Gebäudetyp (int32), Spalten = Typ-Labels aus GEBAEUDETYPEN
     """
     def get(key: str, default: int = 0) -> int:
         return int(params.get(key, default) or 0)
@@ -89,70 +217,48 @@ def build_projection_by_type(params: dict) -> pd.DataFrame:
     n_dl = get("gas_zaehlpunkte_dienstleistung", 95_000)
     n_sonst = get("gas_zaehlpunkte_sonstige_nichtwohn", 35_000)
 
-    wp_jahr = params.get("waermepumpen_pro_jahr", 4_000)
-    fw_bis_30 = params.get("fernwaerme_anschluss_bis_2030", 12_000)
-    fw_ab_30 = params.get("fernwaerme_anschluss_ab_2030", 30_000)
+    achse = zeitachse(params)
+    jahre = achse["jahr"]
+    form = (1, len(jahre))
+    wp_jahr = np.broadcast_to(_rate(params.get("waermepumpen_pro_jahr", 4_000), jahre), form)
+    fw_jahr = np.broadcast_to(_fw_rate(params, jahre), form)
 
     # Anpassbar: wie viele Jahre Verzögerung für dezentral
     dezentral_verzögerung = 5
 
-    typ_labels = [t[1] for t in GEBAEUDETYPEN]
-    counts = {
-        typ_labels[0]: n_efh,
-        typ_labels[1]: n_zentral,
-        typ_labels[2]: n_dezentral,
-        typ_labels[3]: n_gasfw,
-        typ_labels[4]: n_dl,
-        typ_labels[5]: n_sonst,
-    }
-
-    rows = []
-    for jahr in range(BASISJAHR, ZIELJAHR + 1):
-        if jahr == BASISJAHR:
-            for typ, n in counts.items():
-                rows.append({"jahr": jahr, "typ": typ, "gas_verbleibend": n})
-            continue
+    def rest(n0: int, abzug_jahr: np.ndarray) -> np.ndarray:
+        return np.maximum(0, n0 - np.cumsum(_aufteilen(abzug_jahr, achse), axis=1))[0]
 
-        fw_jahr = fw_bis_30 if jahr <= 2030 else fw_ab_30
-        delta = jahr - BASISJAHR
+    # Gas+FW → immer Fernwärme (zuerst); Zentral → Rest-Fernwärme
+    fw = _aufteilen(fw_jahr, achse)
+    gasfw = np.maximum(0, n_gasfw - np.cumsum(fw, axis=1))
+    abzug_gasfw = np.concatenate([[[n_gasfw]], gasfw[:, :-1]], axis=1) - gasfw
+    zentral = np.maximum(0, n_zentral - np.cumsum(fw - abzug_gasfw, axis=1))[0]
 
-        # Gas+FW → immer Fernwärme (zuerst)
-        abzug_gasfw = min(n_gasfw, fw_jahr)
-        n_gasfw = max(0, n_gasfw - abzug_gasfw)
-        fw_rest = fw_jahr - abzug_gasfw
+    # EFH → nur Wärmepumpen; Dezentral → erst nach Verzögerung
+    efh = rest(n_efh, wp_jahr)
+    dezentral = rest(n_dezentral, np.where(jahre - BASISJAHR >= dezentral_verzögerung, fw_jahr // 4, 0))
+    dl = rest(n_dl, (fw_jahr + wp_jahr) // 12)
+    sonst = rest(n_sonst, (fw_jahr + wp_jahr) // 15)
 
-        # Zentral → Rest-Fernwärme
-        abzug_zentral = min(n_zentral, fw_rest)
-        n_zentral = max(0, n_zentral - abzug_zentral)
-
-        # EFH → nur Wärmepumpen
-        n_efh = max(0, n_efh - min(n_efh, wp_jahr))
-
-        # Dezentral → erst nach Verzögerung
-        if delta >= dezentral_verzögerung:
-            abzug_dez = min(n_dezentral, fw_jahr // 4)
-            n_dezentral = max(0, n_dezentral - abzug_dez)
-
-        n_dl = max(0, n_dl - min(n_dl, (fw_jahr + wp_jahr) // 12))
-        n_sonst = max(0, n_sonst - min(n_sonst, (fw_jahr + wp_jahr) // 15))
-
-        counts = {
-            typ_labels[0]: n_efh,
-            typ_labels[1]: n_zentral,
-            typ_labels[2]: n_dezentral,
-            typ_labels[3]: n_gasfw,
-            typ_labels[4]: n_dl,
-            typ_labels[5]: n_sonst,
-        }
-        for typ, n in counts.items():
-            rows.append({"jahr": jahr, "typ": typ, "gas_verbleibend": n})
+    typ_labels = [t[1] for t in GEBAEUDETYPEN]
+    start = np.array([[n_efh], [n_zentral], [n_dezentral], [n_gasfw], [n_dl], [n_sonst]])
+    daten = np.concatenate([start, np.stack([efh, zentral, dezentral, gasfw[0], dl, sonst])], axis=1).astype(np.int32)
 
-    return pd.DataFrame(rows)
+    jahr = np.concatenate([[BASISJAHR], jahre])
+    schritt = np.concatenate([[achse["perioden"]], achse["schritt"]])
+    return ProjectionResult(
+        jahr, typ_labels, daten, achse="typ", wert_name="gas_verbleibend",
+        perioden=achse["perioden"], zeit=jahr - 1 + schritt / achse["perioden"],
+    )
 
 
-def jahr_dekarbonisierung(proj_df: pd.DataFrame, schwellwert: int = 0) -> int | None:
+def jahr_dekarbonisierung(proj_df: ProjectionResult | pd.DataFrame, schwellwert: int = 0) -> int | None:
     """Jahr, ab dem Gas-Heizung <= schwellwert."""
     if proj_df is None or proj_df.empty:
         return None
+    if isinstance(proj_df, ProjectionResult):
+        erreicht = proj_df["gas_heizung_haushalte"] <= schwellwert
+        return int(proj_df.jahre[erreicht.argmax()]) if erreicht.any() else None
     rest = proj_df[proj_df["gas_heizung_haushalte"] <= schwellwert]
     return int(rest["jahr"].min()) if not rest.empty else None
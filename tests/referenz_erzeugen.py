@@ -0,0 +1,103 @@
+"""
+Erzeugt tests/data/referenz_engine.npz aus einer früheren Engine (eingefrorene Referenz).
+
+Die Referenz stammt aus der schleifenbasierten Engine vor der Vektorisierung (Baseline-Commit):
+    git archive <commit> core data | tar -x -C /tmp/referenz
+    python tests/referenz_erzeugen.py /tmp/referenz
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+ZIEL = ROOT / "tests" / "data" / "referenz_engine.npz"
+
+FAKTOREN = [1.0, 0.88, 1.12]
+
+# Zufällige Szenarien: 500 im Bereich der Regler (Zählpunkte für die Typ-Pfade mit variiert) und
+# 100 Grenzfälle, in denen die Fernwärme an die Zahl der Wohnungen stößt und das Wachstum danach
+# die Anschlüsse überholt – nur dort greift die Kappung fw_t = C_t + min.accumulate(...).
+PARAMETER = [
+    "fernwaerme_anschluss_bis_2030",
+    "fernwaerme_anschluss_ab_2030",
+    "heizungstausch_pro_jahr",
+    "anteil_gas_zu_wasserstoff",
+    "waermepumpen_pro_jahr",
+    "wachstum_wohnungen_pro_jahr",
+    "gas_zaehlpunkte_einfamilienhauser",
+    "gas_zaehlpunkte_gas_und_fernwaerme",
+    "gas_zaehlpunkte_dezentral_beheizt",
+]
+SAETZE = [
+    (500, [
+        lambda r: r.randrange(5_000, 25_001, 1_000),
+        lambda r: r.randrange(15_000, 45_001, 1_000),
+        lambda r: r.randrange(5_000, 35_001, 1_000),
+        lambda r: r.randrange(0, 41, 5),
+        lambda r: r.randrange(1_000, 15_001, 500),
+        lambda r: round(r.randrange(0, 16) * 0.1, 1),
+        lambda r: r.randrange(0, 100_001, 1_000),
+        lambda r: r.randrange(0, 200_001, 1_000),
+        lambda r: r.randrange(0, 400_001, 5_000),
+    ]),
+    (100, [
+        lambda r: r.randrange(40_000, 70_001, 1_000),
+        lambda r: r.randrange(0, 15_001, 1_000),
+        lambda r: r.randrange(20_000, 40_001, 1_000),
+        lambda r: r.randrange(0, 11, 5),
+        lambda r: r.randrange(0, 2_001, 500),
+        lambda r: round(r.randrange(10, 31) * 0.1, 1),
+        lambda r: 25_000,
+        lambda r: 85_000,
+        lambda r: 180_000,
+    ]),
+]
+METRIKEN_REFERENZ = [
+    "fernwaerme_haushalte",
+    "gas_heizung_haushalte",
+    "gesamt_wohnungen",
+    "fernwaerme_anteil_pct",
+    "fernwaerme_leitungen_km",
+]
+
+
+def main(referenz: Path) -> None:
+    sys.path.insert(0, str(referenz))
+    import core
+    if not Path(core.__file__).resolve().is_relative_to(referenz.resolve()):
+        raise SystemExit(f"core wurde nicht aus {referenz} importiert")
+    from core.config import default_params
+    from core.data_loader import load_data
+    from core.scenario_engine import build_projection, build_projection_by_type
+
+    df_hist = load_data()["fernwaerme"]
+    rng = random.Random(1)
+    werte = np.array([[float(f(rng)) for f in ziehen] for n, ziehen in SAETZE for _ in range(n)])
+
+    aggregiert, nach_typ = [], []
+    for zeile in werte:
+        p = default_params()
+        p.update({k: (round(v, 1) if k == "wachstum_wohnungen_pro_jahr" else int(v)) for k, v in zip(PARAMETER, zeile)})
+        aggregiert.append([build_projection(p, df_hist, faktor=f)[METRIKEN_REFERENZ].to_numpy(dtype=float).T for f in FAKTOREN])
+        typ = build_projection_by_type(p)
+        nach_typ.append(typ.pivot(index="jahr", columns="typ", values="gas_verbleibend")[list(typ["typ"].unique())].to_numpy().T)
+
+    np.savez_compressed(
+        ZIEL,
+        parameter=np.array(PARAMETER),
+        werte=werte,
+        faktoren=np.array(FAKTOREN),
+        metriken=np.array(METRIKEN_REFERENZ),
+        typen=np.array(list(typ["typ"].unique()), dtype=str),
+        jahre=build_projection(p, df_hist)["jahr"].to_numpy(),
+        aggregiert=np.array(aggregiert),  # (Szenarien, Faktoren, Metriken, Jahre)
+        nach_typ=np.array(nach_typ),  # (Szenarien, Typen, Jahre)
+    )
+    print(f"Referenz gespeichert: {ZIEL}")
+
+
+if __name__ == "__main__":
+    main(Path(sys.argv[1]))
@@ -0,0 +1,91 @@
+"""
+Geteilter Cache: Einmal-Berechnung bei gleichzeitigen Anfragen, LRU-Verdrängung im Speicher,
+Größengrenze der SQLite-Stufe, Fehlerpfad und Versionierung der Schlüssel.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import core.cache as cache_modul  # noqa: E402
+from core.cache import SharedCache, cache_key  # noqa: E402
+
+
+def test_einmal_berechnen_bei_gleichzeitigen_anfragen():
+    cache = SharedCache(max_eintraege=8)
+    aufrufe = []
+    start = threading.Barrier(8)
+
+    def berechnen():
+        aufrufe.append(1)
+        time.sleep(0.05)
+        return "wert"
+
+    def anfrage():
+        start.wait()
+        ergebnisse.append(cache.get_or_compute("k", berechnen))
+
+    ergebnisse = []
+    threads = [threading.Thread(target=anfrage) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(aufrufe) == 1
+    assert ergebnisse == ["wert"] * 8
+    assert cache.stats()["fehlschlaege"] == 1 and cache.stats()["treffer"] == 7
+    assert not cache._key_locks
+
+
+def test_lru_verdraengt_aeltesten_eintrag():
+    cache = SharedCache(max_eintraege=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # a zuletzt genutzt → b wird verdrängt
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_fehler_beim_berechnen(tmp_path):
+    cache = SharedCache(max_eintraege=8, pfad=tmp_path / "cache.sqlite")
+
+    def fehler():
+        raise RuntimeError("kaputt")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("k", fehler)
+    assert not cache._key_locks
+    assert cache.get("k") is None
+    assert cache.get_or_compute("k", lambda: "wert") == "wert"
+    assert cache.stats()["fehlschlaege"] == 2
+
+
+def test_sqlite_stufe_zwischen_instanzen_und_groessengrenze(tmp_path):
+    pfad = tmp_path / "cache.sqlite"
+    block = np.zeros(100_000, dtype=np.uint8)  # ~0.1 MB je Eintrag
+    schreiber = SharedCache(max_eintraege=1, pfad=pfad, max_mb=0.35)
+    for k in "abcde":
+        schreiber.set(k, block)
+        time.sleep(0.01)  # eindeutige Zugriffszeiten
+
+    leser = SharedCache(max_eintraege=8, pfad=pfad, max_mb=0.35)
+    assert leser.get("a") is None and leser.get("b") is None
+    for k in "cde":
+        np.testing.assert_array_equal(leser.get(k), block)
+    groesse = leser._con().execute("SELECT SUM(groesse) FROM ergebnisse").fetchone()[0]
+    assert groesse <= leser.max_bytes
+
+
+def test_cache_version_im_schluessel(monkeypatch):
+    alt = cache_key("build_projection", {"a": 1})
+    monkeypatch.setattr(cache_modul, "CACHE_VERSION", cache_modul.CACHE_VERSION + 1)
+    assert cache_key("build_projection", {"a": 1}) != alt
@@ -0,0 +1,73 @@
+"""
+Die Rückrechnung der Kalibrierung ist eine eigene, stetige Fassung der Engine-Logik.
+Sie muss build_projection_batch() über einen Vorwärts-Horizont ab BASISJAHR folgen
+(bis UMSTELLJAHR, danach wechselt die Engine auf fernwaerme_anschluss_ab_2030); Abweichungen
+sind nur durch die Ganzzahl-Rundung der Engine erlaubt (höchstens ~1 je Jahr und Reihe).
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from core.calibration import REIHEN, kalibrieren, rueckrechnung  # noqa: E402
+from core.config import BASISJAHR, UMSTELLJAHR, default_params  # noqa: E402
+from core.data_loader import load_data  # noqa: E402
+from core.scenario_engine import build_projection_batch  # noqa: E402
+
+PARAMETER = [
+    "fernwaerme_anschluss_bis_2030",
+    "heizungstausch_pro_jahr",
+    "anteil_gas_zu_wasserstoff",
+    "waermepumpen_pro_jahr",
+    "wachstum_wohnungen_pro_jahr",
+    "fernwaerme_leitungen_m_pro_anschluss",
+]
+
+
+@pytest.fixture(scope="module")
+def df_hist():
+    return load_data()["fernwaerme"]
+
+
+def _szenarien(n: int = 200) -> np.ndarray:
+    rng = np.random.default_rng(7)
+    theta = np.column_stack([
+        rng.integers(5_000, 25_001, n),
+        rng.integers(5_000, 35_001, n),
+        rng.integers(0, 41, n),
+        rng.integers(1_000, 15_001, n),
+        rng.uniform(0.0, 1.5, n).round(1),
+        rng.uniform(0.5, 3.0, n),
+    ]).astype(float)
+    theta[:10, 0] = 200_000  # Fernwärme an der Obergrenze (Zahl der Wohnungen)
+    theta[10:20, 1] = 300_000  # Gas nach wenigen Jahren erschöpft
+    return theta
+
+
+def test_rueckrechnung_folgt_engine(df_hist):
+    theta = _szenarien()
+    params = default_params() | {"zieljahr": UMSTELLJAHR}
+    batch = params | {k: theta[:, j] for j, k in enumerate(PARAMETER)}
+    engine = build_projection_batch(batch, df_hist)
+
+    start = df_hist[df_hist["jahr"] == BASISJAHR].iloc[0]
+    n_jahre = UMSTELLJAHR - BASISJAHR + 1
+    kalib = rueckrechnung(theta, PARAMETER, params, start, n_jahre)
+
+    toleranz = {"fernwaerme_haushalte": 2 * n_jahre, "gas_heizung_haushalte": 0, "gesamt_wohnungen": n_jahre, "fernwaerme_leitungen_km": 0.5}
+    for i, reihe in enumerate(REIHEN):
+        np.testing.assert_allclose(kalib[:, i, :], engine[reihe], rtol=0, atol=toleranz[reihe], err_msg=reihe)
+
+
+def test_kalibrieren_residuen(df_hist):
+    kal = kalibrieren(df_hist)
+    obs = df_hist[df_hist["jahr"] <= BASISJAHR]
+    assert list(kal["residuen"]["jahr"]) == sorted(obs["jahr"])
+    assert list(kal["residuen"].columns) == ["jahr", *REIHEN]
+    for reihe in REIHEN:
+        assert kal["rmse"][reihe] == pytest.approx(float(np.sqrt((kal["residuen"][reihe] ** 2).mean())))
@@ -0,0 +1,72 @@
+"""
+Regressionstest: die vektorisierte Engine muss die eingefrorenen Ergebnisse der früheren,
+schleifenbasierten Engine reproduzieren (tests/data/referenz_engine.npz, erzeugt mit
+tests/referenz_erzeugen.py). Geprüft werden 600 Zufallsszenarien (davon 100 Grenzfälle an der
+Kappung durch die Zahl der Wohnungen) × 3 Korridor-Faktoren (Jahresschritte, Horizont ZIELJAHR)
+sowie die Pfade je Gebäudetyp.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from core.config import default_params  # noqa: E402
+from core.data_loader import load_data  # noqa: E402
+from core.scenario_engine import build_projection, build_projection_batch, build_projection_by_type  # noqa: E402
+
+REFERENZ = ROOT / "tests" / "data" / "referenz_engine.npz"
+GANZZAHLIG = {"fernwaerme_haushalte", "gas_heizung_haushalte", "gesamt_wohnungen"}
+
+
+@pytest.fixture(scope="module")
+def referenz():
+    with np.load(REFERENZ) as f:
+        return {k: f[k] for k in f.files}
+
+
+@pytest.fixture(scope="module")
+def df_hist():
+    return load_data()["fernwaerme"]
+
+
+def _params(referenz, i=None) -> dict:
+    """Parameter eines Szenarios (i) oder des ganzen Satzes als Batch (Arrays)."""
+    p = default_params()
+    for j, key in enumerate(referenz["parameter"]):
+        spalte = referenz["werte"][:, j]
+        p[str(key)] = spalte if i is None else (float(spalte[i]) if key == "wachstum_wohnungen_pro_jahr" else int(spalte[i]))
+    return p
+
+
+@pytest.mark.parametrize("f_idx", [0, 1, 2])
+def test_batch_wie_referenz(referenz, df_hist, f_idx):
+    faktor = float(referenz["faktoren"][f_idx])
+    res = build_projection_batch(_params(referenz), df_hist, faktor=faktor)
+    np.testing.assert_array_equal(res["jahr"], referenz["jahre"])
+    for m_idx, metrik in enumerate(referenz["metriken"]):
+        erwartet = referenz["aggregiert"][:, f_idx, m_idx]
+        if metrik in GANZZAHLIG:
+            np.testing.assert_array_equal(res[str(metrik)], erwartet, err_msg=str(metrik))
+        else:
+            np.testing.assert_allclose(res[str(metrik)], erwartet, rtol=1e-12, atol=1e-9, err_msg=str(metrik))
+
+
+def test_einzeln_wie_referenz(referenz, df_hist):
+    # build_projection() speichert float32: Stichprobe mit float32-Genauigkeit
+    for i in range(0, len(referenz["werte"]), 10):
+        proj = build_projection(_params(referenz, i), df_hist)
+        for m_idx, metrik in enumerate(referenz["metriken"]):
+            werte = proj.daten[proj.spalten.index(str(metrik))]
+            np.testing.assert_allclose(werte, referenz["aggregiert"][i, 0, m_idx], rtol=1e-6, err_msg=f"{i} {metrik}")
+
+
+def test_nach_typ_wie_referenz(referenz):
+    for i in range(len(referenz["werte"])):
+        res = build_projection_by_type(_params(referenz, i))
+        assert list(res.spalten) == [str(t) for t in referenz["typen"]]
+        np.testing.assert_array_equal(res.daten, referenz["nach_typ"][i], err_msg=str(i))
@@ -0,0 +1,88 @@
+"""
+Export → Import: Parameter (Werte und Typen) und Projektionen müssen in beiden Formaten
+unverändert zurückkommen – z.B. bleibt wachstum_wohnungen_pro_jahr=1.0 ein float (Slider der App).
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from core.cache import daten_hash, korridor, projektion, projektion_by_type  # noqa: E402
+from core.config import default_params  # noqa: E402
+from core.data_loader import load_data  # noqa: E402
+from core.export import FORMATE, exportieren, exportieren_batch, importieren  # noqa: E402
+from core.scenario_engine import jahr_dekarbonisierung  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def df_hist():
+    return load_data()["fernwaerme"]
+
+
+@pytest.fixture(scope="module")
+def szenarien(df_hist):
+    varianten = [
+        {"wachstum_wohnungen_pro_jahr": 1.0},
+        {"wachstum_wohnungen_pro_jahr": 0.0, "anteil_gas_zu_wasserstoff": 0},
+        {"zieljahr": 2035, "zeitschritt": "quartal"},
+    ]
+    liste = []
+    for i, v in enumerate(varianten):
+        params = default_params() | v
+        proj = projektion(params, df_hist)
+        liste.append({"name": f"Szenario {i + 1}", "params": params, "proj": proj, "jahr_dekarbonisierung": jahr_dekarbonisierung(proj)})
+    return liste
+
+
+def _typen(x):
+    if isinstance(x, dict):
+        return {k: _typen(v) for k, v in x.items()}
+    return type(x)
+
+
+@pytest.mark.parametrize("format", list(FORMATE))
+def test_rundreise(tmp_path, df_hist, szenarien, format):
+    exportieren(szenarien, tmp_path, df_hist, format=format)
+    importiert = importieren(tmp_path)
+
+    assert [s["name"] for s in importiert] == [s["name"] for s in szenarien]
+    for alt, neu in zip(szenarien, importiert):
+        assert neu["params"] == alt["params"]
+        assert _typen(neu["params"]) == _typen(alt["params"])
+        assert neu["jahr_dekarbonisierung"] == alt["jahr_dekarbonisierung"]
+        assert neu["proj"].spalten == alt["proj"].spalten
+        np.testing.assert_array_equal(neu["proj"].jahre, alt["proj"].jahre)
+        np.testing.assert_array_equal(neu["proj"].daten, alt["proj"].daten)
+        np.testing.assert_array_equal(neu["proj_typ"].daten, projektion_by_type(alt["params"]).daten)
+        for n, a in zip(neu["korridor"], korridor(alt["params"], df_hist)):
+            np.testing.assert_array_equal(n.daten, a.daten)
+        assert neu["hash_basis"] == daten_hash(df_hist)
+
+
+@pytest.mark.parametrize("format", list(FORMATE))
+def test_rundreise_batch(tmp_path, df_hist, format):
+    params = default_params() | {"wachstum_wohnungen_pro_jahr": np.array([0.0, 0.5, 1.0])}
+    exportieren_batch(params, df_hist, tmp_path, format=format)
+    importiert = importieren(tmp_path)
+
+    assert [s["params"]["wachstum_wohnungen_pro_jahr"] for s in importiert] == [0.0, 0.5, 1.0]
+    assert all(type(s["params"]["wachstum_wohnungen_pro_jahr"]) is float for s in importiert)
+    assert all(type(s["params"]["heizungstausch_pro_jahr"]) is int for s in importiert)
+
+
+def test_import_ohne_typ_und_korridor(tmp_path, szenarien):
+    exportieren(szenarien, tmp_path, format="arrow", nach_typ=False)
+    importiert = importieren(tmp_path)
+    assert all(s["proj_typ"] is None and s["korridor"] is None and s["hash_basis"] is None for s in importiert)
+
+
+def test_import_ohne_projektion(tmp_path, df_hist, szenarien):
+    exportieren(szenarien, tmp_path, df_hist, format="arrow")
+    (tmp_path / "projektion.arrow").unlink()
+    with pytest.raises(ValueError, match="projektion"):
+        importieren(tmp_path)